@@ -1,70 +1,69 @@
+import os
+
 import streamlit as st
-import random
-from typing import List
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
+import metrics
+from session_store import SessionStore
+from wordle_engine import WordIndex, WordleGame, load_word_index
 
-# =======================
-# Wordle Logic
-# =======================
-class WordleGame:
-    def __init__(self, word_list: List[str]):
-        self.word_list = word_list
-        self.target = random.choice(self.word_list)
-        self.max_attempts = 6
-        self.attempts = []
-        self.status = "IN_PROGRESS"
-
-    def guess(self, word: str):
-        if self.status != "IN_PROGRESS":
-            return
-
-        word = word.lower()
-        feedback = self.get_feedback(word)
-        self.attempts.append((word, feedback))
-
-        if word == self.target:
-            self.status = "WON"
-        elif len(self.attempts) >= self.max_attempts:
-            self.status = "LOST"
-
-    def get_feedback(self, guess: str) -> List[str]:
-        feedback = ["gray"] * 5
-        target_chars = list(self.target)
-        guess_chars = list(guess)
-
-        # First pass - green
-        for i in range(5):
-            if guess_chars[i] == target_chars[i]:
-                feedback[i] = "green"
-                target_chars[i] = None
-
-        # Second pass - yellow
-        for i in range(5):
-            if feedback[i] == "gray" and guess_chars[i] in target_chars:
-                feedback[i] = "yellow"
-                target_chars[target_chars.index(guess_chars[i])] = None
-
-        return feedback
+WORDS_PATH = os.environ.get("WORDLE_WORDS", "words.txt")  # a word list, or a compiled .widx
+WORD_LENGTH = os.environ.get("WORDLE_WORD_LENGTH", "5")  # ignored for a .widx, whose header has it
 
 
 # =======================
 # Utilities
 # =======================
-@st.cache_data
-def load_words():
-    with open("words.txt", "r") as f:
-        return [line.strip() for line in f if len(line.strip()) == 5]
-
-
+@st.cache_resource  # One shared index per process; cache_data would hand each caller a copy
+def load_words() -> WordIndex:
+    # Memory-maps the compiled dictionary, compiling it on the first start
+    return load_word_index(WORDS_PATH, int(WORD_LENGTH))
+
+
+@st.cache_resource  # Shared by every session: hot games in memory, the rest in SQLite
+def session_store() -> SessionStore:
+    word_index = load_words()
+    return SessionStore.from_env("wordle_sessions.db", WordleGame.to_record,
+                                 lambda record: WordleGame.from_record(record, word_index))
+
+
+def current_game(word_index: WordIndex, store: SessionStore):
+    # The session key rides in the URL (?session=...), so a reload or a server
+    # restart resumes the same game; st.session_state only remembers which key
+    # this browser session owns. A session arriving with someone else's key
+    # (reload, copied link, duplicated tab) plays on from a private copy under a
+    # fresh key, so two sessions never share one live WordleGame.
+    key = st.query_params.get("session")
+    game = store.get(key) if key else None
+    if game is None or st.session_state.get("session_key") != key:
+        if game is None:
+            game = WordleGame(word_index)
+        else:
+            game = WordleGame.from_record(game.to_record(), word_index)
+        key = store.new_key()
+        store.put(key, game)
+        st.query_params["session"] = key
+        st.session_state.session_key = key
+    return key, game
+
+
+@metrics.timed("display_attempts")
 def display_attempts(attempts):
+    html_bytes = 0
     for word, feedback in attempts:
-        cols = st.columns(5)
+        cols = st.columns(len(word))
         for i, letter in enumerate(word):
             bg_color = {"green": "#6aaa64", "yellow": "#c9b458", "gray": "#787c7e"}[feedback[i]]
-            cols[i].markdown(
-                f"<div style='background-color:{bg_color}; color:white; padding:10px; text-align:center; border-radius:5px; font-weight:bold'>{letter.upper()}</div>",
-                unsafe_allow_html=True,
-            )
+            html = f"<div style='background-color:{bg_color}; color:white; padding:10px; text-align:center; border-radius:5px; font-weight:bold'>{letter.upper()}</div>"
+            cols[i].markdown(html, unsafe_allow_html=True)
+            html_bytes += len(html)
+    metrics.observe("attempts_html_bytes", html_bytes, metrics.BYTES_BUCKETS)
+
+
+def track_session():
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        metrics.session_seen(ctx.session_id)
 
 
 # =======================
@@ -72,14 +71,30 @@ def display_attempts(attempts):
 # =======================
 def main():
     st.set_page_config(page_title="Wordle Game", page_icon="🟩")
-    st.title("🟩 Wordle Clone in Streamlit")
 
-    word_list = load_words()
+    # Local metrics page at ?metrics when started with APP_METRICS=1
+    if metrics.ENABLED and "metrics" in st.query_params:
+        st.code(metrics.exposition("wordle"), language="text")
+        return
+    if metrics.ENABLED:
+        track_session()
 
-    if "game" not in st.session_state:
-        st.session_state.game = WordleGame(word_list)
+    st.title("🟩 Wordle Clone in Streamlit")
 
-    game: WordleGame = st.session_state.game
+    try:
+        word_index = load_words()
+    except ValueError as e:  # e.g. WORDLE_WORD_LENGTH not a number, or outside what the hint search supports
+        st.error(f"Cannot load {WORDS_PATH}: {e}")
+        return
+    store = session_store()
+    key, game = current_game(word_index, store)
+
+    # Hard mode can only change before the first guess, as in the original game
+    hard_mode = st.toggle("Hard mode", value=game.hard_mode, disabled=bool(game.attempts),
+                          help="Revealed hints must be used in later guesses")
+    if hard_mode != game.hard_mode:
+        game.hard_mode = hard_mode
+        store.put(key, game)
 
     if game.status == "WON":
         st.success(f"🎉 You guessed the word: {game.target.upper()}!")
@@ -89,20 +104,31 @@ def main():
         st.info(f"Attempt {len(game.attempts)+1} of {game.max_attempts}")
 
     display_attempts(game.attempts)
+    if game.attempts and game.status == "IN_PROGRESS":
+        st.caption(f"Remaining candidates: {game.remaining()}")
 
     if game.status == "IN_PROGRESS":
         with st.form("guess_form", clear_on_submit=True):
-            guess = st.text_input("Enter your 5-letter guess").strip().lower()
+            guess = st.text_input(f"Enter your {word_index.word_length}-letter guess").strip().lower()
             submitted = st.form_submit_button("Submit")
             if submitted:
-                if len(guess) != 5 or guess not in word_list:
-                    st.warning("Invalid guess. Make sure it's a valid 5-letter word.")
+                if len(guess) != word_index.word_length or guess not in word_index:
+                    st.warning(f"Invalid guess. Make sure it's a valid {word_index.word_length}-letter word.")
+                elif game.hard_mode and game.hard_mode_error(guess):
+                    st.warning(f"Hard mode: {game.hard_mode_error(guess)}")
                 else:
                     game.guess(guess)
+                    store.put(key, game)
+                    st.rerun()
+
+    if game.status == "IN_PROGRESS" and st.button("💡 Hint"):
+        suggestion = game.hint()
+        if suggestion:
+            st.info(f"Try: {suggestion.upper()}")
 
     if st.button("🔄 Restart Game"):
-        st.session_state.game = WordleGame(word_list)
-        st.experimental_rerun()
+        store.put(key, WordleGame(word_index, hard_mode=game.hard_mode))
+        st.rerun()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,359 @@
+import argparse
+import atexit
+import collections
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "tower-of-hanoi-streamlit"))
+
+from hanoi_engine import (HanoiState, frame_stewart_count, hanoi_moves, multi_peg_moves, optimal_move_count,
+                          state_after)
+from hanoi_movelog import GameProgress
+from wordle_engine import (LetterIndex, WordIndex, WordleGame, compiled_path, decode_pattern, encode_words,
+                           feedback_pattern, load_word_index, pattern_matrix, random_words)
+
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+THRESHOLD = 0.25  # slower than baseline by more than this fraction is a regression
+# Timed in every run; other cases are compared as a ratio to it, so a machine
+# that is busier or slower as a whole does not read as a regression
+REFERENCE = ("hanoi.generate.recursive", 15)
+# Cases bound by process start-up and disk I/O rather than the CPU loop the
+# reference measures; they are compared on raw medians
+RAW_TIMINGS = set()
+
+# A benchmark takes a size and returns (callable to time, work items per call).
+# Setup cost stays outside the timed callable.
+Setup = Callable[[int], Tuple[Callable[[], object], int]]
+BENCHMARKS: Dict[str, Tuple[Setup, Tuple[int, ...]]] = {}
+
+
+def benchmark(name: str, *sizes: int, relative: bool = True):
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = (setup, sizes)
+        if not relative:
+            RAW_TIMINGS.add(name)
+        return setup
+    return register
+
+
+def consume(iterator):
+    collections.deque(iterator, maxlen=0)
+
+
+# =======================
+# Hanoi
+# =======================
+def generate_hanoi_moves(n, src, dest, aux, moves):
+    # The original recursive generator, kept as the reference point
+    if n == 1:
+        moves.append((src, dest))
+    else:
+        generate_hanoi_moves(n - 1, src, aux, dest, moves)
+        moves.append((src, dest))
+        generate_hanoi_moves(n - 1, aux, dest, src, moves)
+
+
+@benchmark("hanoi.generate.recursive", 10, 15, 20)
+def bench_generate_recursive(n):
+    return (lambda: generate_hanoi_moves(n, 0, 2, 1, [])), optimal_move_count(n)
+
+
+@benchmark("hanoi.generate.iterative", 10, 15, 20)
+def bench_generate_iterative(n):
+    return (lambda: consume(hanoi_moves(n))), optimal_move_count(n)
+
+
+@benchmark("hanoi.generate.frame_stewart_4peg", 10, 20, 30)
+def bench_generate_frame_stewart(n):
+    return (lambda: consume(multi_peg_moves(n, 4))), frame_stewart_count(n, 4)
+
+
+@benchmark("hanoi.state.move", 10, 15, 20)
+def bench_state_move(n):
+    # The board update behind every app's move_disk
+    moves = list(hanoi_moves(n))
+
+    def run():
+        state = HanoiState(n)
+        for from_peg, to_peg in moves:
+            state.move(from_peg, to_peg)
+    return run, len(moves)
+
+
+def _mid_solve(n) -> HanoiState:
+    # Halfway through the optimal solution every peg holds disks
+    return HanoiState.from_pegs(state_after(n, optimal_move_count(n) // 2))
+
+
+@benchmark("hanoi.render.pywebio_pegs", 3, 10, 30)
+def bench_render_pywebio(n):
+    # HTML that HanoiWeb.render sends for the pegs; sending it needs a live session
+    from hanoi_app import HanoiWeb
+    web = HanoiWeb()
+    web.num_disks = n
+    web.state = _mid_solve(n)
+    return (lambda: [web.peg_html(i) for i in range(3)]), 3
+
+
+def _streamlit_app():
+    # Imported in Streamlit's bare mode: widgets return their defaults and
+    # session_state is a plain store, which is all peg_html needs
+    logging.disable(logging.WARNING)
+    os.environ.setdefault("APP_SESSION_STORE", "memory")  # no session database for a benchmark
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import hanoi_app_streamlit_fail
+    finally:
+        logging.disable(logging.NOTSET)
+    return hanoi_app_streamlit_fail
+
+
+@benchmark("hanoi.render.streamlit_pegs", 3, 10, 30)
+def bench_render_streamlit(n):
+    # HTML render_game writes into its peg placeholders
+    app = _streamlit_app()
+    app.st.session_state.num_disks = n
+    app.save_game(GameProgress(_mid_solve(n)))
+    app.st.session_state.selected_peg = None
+    return (lambda: [app.peg_html(i) for i in range(3)]), 3
+
+
+# =======================
+# Wordle
+# =======================
+@benchmark("wordle.feedback.get_feedback", 1000)
+def bench_get_feedback(n):
+    words = random_words(n)
+    game = WordleGame(WordIndex(words), words[0])
+    return (lambda: [game.get_feedback(word) for word in words]), n
+
+
+@benchmark("wordle.feedback.pattern_matrix", 100, 1000)
+def bench_pattern_matrix(n):
+    words = encode_words(random_words(n))
+    return (lambda: pattern_matrix(words, words)), n * n
+
+
+def _probes(words, count=1000):
+    # Half dictionary words, half near misses
+    half = count // 2
+    return words[:half] + [word[:-1] + "#" for word in words[:count - half]]
+
+
+@benchmark("wordle.validate.list", 2000, 13000, 100000)
+def bench_validate_list(n):
+    # The original check: membership in the word list
+    words = random_words(n)
+    probes = _probes(words)
+    return (lambda: [word in words for word in probes]), len(probes)
+
+
+@benchmark("wordle.validate.index", 2000, 13000, 100000)
+def bench_validate_index(n):
+    words = random_words(n)
+    index = WordIndex(words)
+    probes = _probes(words)
+    return (lambda: [word in index for word in probes]), len(probes)
+
+
+@benchmark("wordle.validate.compiled", 2000, 13000, 100000)
+def bench_validate_compiled(n):
+    # What the apps validate with: binary search over the memory-mapped .widx
+    words = random_words(n)
+    index = load_word_index(_word_list(n))
+    probes = _probes(words)
+    return (lambda: [word in index for word in probes]), len(probes)
+
+
+@benchmark("wordle.constraints.scan", 2000, 13000)
+def bench_constraints_scan(n):
+    # Filtering by re-scoring every word against the feedback
+    words = random_words(n)
+    target, guess = words[0], words[1]
+    pattern = feedback_pattern(guess, target)
+    return (lambda: [word for word in words if feedback_pattern(guess, word) == pattern]), n
+
+
+@benchmark("wordle.constraints.bitmask", 2000, 13000, 100000)
+def bench_constraints_bitmask(n):
+    words = random_words(n)
+    letters = LetterIndex(WordIndex(words))
+    target, guess = words[0], words[1]
+    colors = decode_pattern(feedback_pattern(guess, target), len(guess))
+    return (lambda: letters.count(letters.feedback_mask(guess, colors))), n
+
+
+# =======================
+# Start-up
+# =======================
+_startup_dir = None
+
+
+def _word_list(n) -> str:
+    # Synthetic words.txt of n words in a scratch directory removed at exit
+    global _startup_dir
+    if _startup_dir is None:
+        _startup_dir = tempfile.mkdtemp(prefix="wordle_startup_")
+        atexit.register(shutil.rmtree, _startup_dir, True)
+    path = os.path.join(_startup_dir, f"words_{n}.txt")
+    if not os.path.exists(path):
+        with open(path, "w") as f:
+            f.write("\n".join(random_words(n)) + "\n")
+    return path
+
+
+def _first_render(n, compiled: bool):
+    # Cold process to first render: Python starts, imports the app, loads the
+    # dictionary and draws the page in Streamlit's bare mode, then exits
+    words = _word_list(n)
+    env = dict(os.environ, WORDLE_WORDS=words, APP_SESSION_STORE="memory")
+    command = [sys.executable, os.path.join(HERE, "Wa_game.py")]
+
+    def run():
+        if not compiled and os.path.exists(compiled_path(words)):
+            os.remove(compiled_path(words))
+        subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if compiled:
+        run()
+    return run, 1
+
+
+@benchmark("wordle.startup.first_start", 2000, 300000, relative=False)
+def bench_startup_first(n):
+    # Parses the word list and writes the compiled dictionary
+    return _first_render(n, compiled=False)
+
+
+@benchmark("wordle.startup.compiled", 2000, 300000, relative=False)
+def bench_startup_compiled(n):
+    # Maps the dictionary compiled by an earlier start
+    return _first_render(n, compiled=True)
+
+
+# =======================
+# Runner
+# =======================
+def time_case(setup: Setup, size: int, repeat: int) -> dict:
+    fn, items = setup(size)
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [total / number for total in timer.repeat(repeat, number)]
+    return {
+        "seconds": min(runs),
+        "median": statistics.median(runs),
+        "items": items,
+        "ns_per_item": min(runs) / items * 1e9,
+    }
+
+
+def run(selected: List[str], repeat: int, quick: bool) -> dict:
+    name, size = REFERENCE
+    reference_key = f"{name}[{size}]"
+    results = {reference_key: time_case(BENCHMARKS[name][0], size, repeat)}
+    print(f"  {reference_key}", file=sys.stderr)
+    for name, (setup, sizes) in BENCHMARKS.items():
+        if selected and not any(part in name for part in selected):
+            continue
+        for size in sizes[:1] if quick else sizes:
+            key = f"{name}[{size}]"
+            if key in results:
+                continue
+            try:
+                results[key] = time_case(setup, size, repeat)
+            except ImportError as e:  # an app's UI library is not installed
+                results[key] = {"skipped": str(e)}
+            print(f"  {key}", file=sys.stderr)
+    reference = results[reference_key]["median"]
+    for key, result in results.items():
+        if "median" in result and key.partition("[")[0] not in RAW_TIMINGS:
+            result["relative"] = result["median"] / reference
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> Dict[str, str]:
+    # Medians relative to the reference measured in the same run; RAW_TIMINGS
+    # cases and entries saved before relative timings existed use raw medians
+    verdicts = {}
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if "median" not in current or not previous or "median" not in previous:
+            continue
+        if "relative" in current and "relative" in previous:
+            ratio = current["relative"] / previous["relative"]
+        else:
+            ratio = current["median"] / previous["median"]
+        current["baseline_ratio"] = ratio
+        if ratio > 1 + threshold:
+            verdicts[key] = "REGRESSION"
+        elif ratio < 1 / (1 + threshold):
+            verdicts[key] = "faster"
+    return verdicts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for the Hanoi and Wordle engines and apps")
+    parser.add_argument("filter", nargs="*", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--quick", action="store_true", help="smallest size of each benchmark only")
+    parser.add_argument("--json", help="write results as JSON here ('-' for stdout)")
+    parser.add_argument("--baseline", default=BASELINE, help="results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results in the baseline, keeping entries for benchmarks not run")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    results = run(args.filter, args.repeat, args.quick)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+    verdicts = {} if args.save_baseline else compare(results, baseline, args.threshold)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'benchmark':<45} {'per call':>12} {'per item':>12} {'vs base':>8}")
+        for key, r in results.items():
+            if "skipped" in r:
+                print(f"{key:<45} skipped: {r['skipped']}")
+                continue
+            ratio = f"{r['baseline_ratio']:.2f}x" if "baseline_ratio" in r else "-"
+            print(f"{key:<45} {r['seconds'] * 1e3:>10.3f}ms {r['ns_per_item']:>10.1f}ns {ratio:>8}  "
+                  f"{verdicts.get(key, '')}")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        report["results"] = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 1 if "REGRESSION" in verdicts.values() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
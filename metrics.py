@@ -0,0 +1,167 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Sequence
+
+# =======================
+# Opt-in instrumentation
+# =======================
+# Off unless APP_METRICS=1 is set (or enable() is called). While off, every hook
+# below is one flag check, so the instrumented hot paths cost nothing noticeable.
+ENABLED = os.environ.get("APP_METRICS", "") not in ("", "0")
+
+SECONDS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+SESSION_IDLE_SECONDS = 300  # a session seen within this window counts as active
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[str, int] = {}
+_sessions: Dict[str, float] = {}  # session id -> last seen
+_live_sessions = 0                # sessions with an explicit start/end (pywebio)
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = on
+
+
+def observe(name: str, value: float, buckets: Sequence[float] = SECONDS_BUCKETS):
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def observe_size(name: str, text: str):
+    # Size of rendered output in UTF-8 bytes
+    if ENABLED:
+        observe(name, len(text.encode("utf-8")), BYTES_BUCKETS)
+
+
+def count(name: str, amount: int = 1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class timer:
+    # with timer("name"): ... records the block's latency in the "name_seconds" histogram
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        if ENABLED:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if ENABLED and self.start:
+            observe(f"{self.name}_seconds", time.perf_counter() - self.start)
+
+
+def timed(name: str) -> Callable:
+    # Decorator form of timer for functions and methods
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(f"{name}_seconds", time.perf_counter() - start)
+        return inner
+    return wrap
+
+
+# =======================
+# Sessions
+# =======================
+def session_seen(session_id: str):
+    # For servers without an end-of-session hook (Streamlit): call on every run
+    if ENABLED:
+        with _lock:
+            if session_id not in _sessions:
+                _counters["sessions_total"] = _counters.get("sessions_total", 0) + 1
+            _sessions[session_id] = time.monotonic()
+
+
+class session:
+    # with session(): ... for servers where a session is one coroutine (pywebio)
+    def __enter__(self):
+        global _live_sessions
+        if ENABLED:
+            with _lock:
+                _live_sessions += 1
+                _counters["sessions_total"] = _counters.get("sessions_total", 0) + 1
+        return self
+
+    def __exit__(self, *exc):
+        global _live_sessions
+        if ENABLED:
+            with _lock:
+                _live_sessions -= 1
+
+
+def active_sessions() -> int:
+    cutoff = time.monotonic() - SESSION_IDLE_SECONDS
+    with _lock:
+        for session_id in [s for s, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session_id]
+        return _live_sessions + len(_sessions)
+
+
+# =======================
+# Exposition
+# =======================
+def exposition(prefix: str = "app") -> str:
+    # Prometheus text format for everything recorded in this process
+    lines = [f"# TYPE {prefix}_sessions_active gauge", f"{prefix}_sessions_active {active_sessions()}"]
+    with _lock:
+        for name, value in sorted(_counters.items()):
+            lines += [f"# TYPE {prefix}_{name} counter", f"{prefix}_{name} {value}"]
+        for name, histogram in sorted(_histograms.items()):
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket in zip(histogram.bounds + ("+Inf",), histogram.counts):
+                cumulative += bucket
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines += [f"{metric}_sum {histogram.total:.6g}", f"{metric}_count {histogram.count}"]
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    global _live_sessions
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _sessions.clear()
+        _live_sessions = 0
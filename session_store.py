@@ -0,0 +1,220 @@
+import atexit
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import metrics
+
+# =======================
+# Backends
+# =======================
+# A backend keeps one compact record (bytes) per session key. SQLite is the
+# default so games survive a restart; the memory backend is for tests and
+# throwaway servers. Both are safe to share between Streamlit's script threads.
+MAX_AGE_SECONDS = 7 * 24 * 3600  # records untouched for this long are purged on open
+
+
+class MemoryBackend:
+    def __init__(self):
+        self.records: Dict[str, Tuple[bytes, float]] = {}
+        self.lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            entry = self.records.get(key)
+        return entry[0] if entry else None
+
+    def save_many(self, items: Iterable[Tuple[str, bytes]]):
+        now = time.time()
+        with self.lock:
+            for key, record in items:
+                self.records[key] = (record, now)
+
+    def delete(self, key: str):
+        with self.lock:
+            self.records.pop(key, None)
+
+    def purge(self, max_age: float) -> int:
+        cutoff = time.time() - max_age
+        with self.lock:
+            old = [key for key, (_, updated) in self.records.items() if updated < cutoff]
+            for key in old:
+                del self.records[key]
+        return len(old)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    # One table, one row per session; WAL so readers never wait on a flush
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                            "(key TEXT PRIMARY KEY, record BLOB NOT NULL, updated REAL NOT NULL) WITHOUT ROWID")
+
+    def load(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            row = self.db.execute("SELECT record FROM sessions WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def save_many(self, items: Iterable[Tuple[str, bytes]]):
+        now = time.time()
+        rows = [(key, record, now) for key, record in items]
+        if not rows:
+            return
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", rows)
+            self.db.execute("COMMIT")
+
+    def delete(self, key: str):
+        with self.lock:
+            self.db.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def purge(self, max_age: float) -> int:
+        with self.lock:
+            return self.db.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - max_age,)).rowcount
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def open_backend(spec: str):
+    # "sqlite:path/to/file.db" or "memory"
+    kind, _, path = spec.partition(":")
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite" and path:
+        return SQLiteBackend(path)
+    raise ValueError(f"Unknown session store {spec!r}; use sqlite:<file> or memory")
+
+
+# =======================
+# Hot session cache
+# =======================
+class SessionStore:
+    # Live game objects for recently active sessions, in LRU order, in front of
+    # a backend holding every session as a compact record. put() marks a
+    # session dirty; dirty sessions are written when evicted (over max_sessions,
+    # or idle for idle_seconds) and at most every flush_seconds while in use,
+    # so a busy game costs one small write every few seconds, not one per move.
+    # Resident memory is bounded by max_sessions live games whatever the number
+    # of players; a session that comes back is decoded from its record.
+    def __init__(self, backend, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any],
+                 max_sessions: int = 1000, idle_seconds: float = 600, flush_seconds: float = 5):
+        self.backend = backend
+        self.encode = encode
+        self.decode = decode
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.flush_seconds = flush_seconds
+        self.hot: "OrderedDict[str, list]" = OrderedDict()  # key -> [game, last used, last written, dirty]
+        self.lock = threading.RLock()
+        atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls, default_path: str, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any],
+                 prefix: str = "APP_SESSION") -> "SessionStore":
+        # APP_SESSION_STORE (sqlite:<file> or memory), APP_SESSION_MAX, APP_SESSION_IDLE
+        backend = open_backend(os.environ.get(f"{prefix}_STORE", f"sqlite:{default_path}"))
+        backend.purge(MAX_AGE_SECONDS)
+        return cls(backend, encode, decode, max_sessions=int(os.environ.get(f"{prefix}_MAX", 1000)),
+                   idle_seconds=float(os.environ.get(f"{prefix}_IDLE", 600)))
+
+    @staticmethod
+    def new_key() -> str:
+        return secrets.token_urlsafe(12)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.hot.get(key)
+            if entry is not None:
+                entry[1] = now
+                self.hot.move_to_end(key)
+                metrics.count("session_store_hits")
+                return entry[0]
+        record = self.backend.load(key)
+        metrics.count("session_store_misses")
+        if record is None:
+            return None
+        with metrics.timer("session_restore"):
+            game = self.decode(record)
+        with self.lock:
+            self.hot[key] = [game, now, now, False]
+            self._evict(now)
+        return game
+
+    def put(self, key: str, game: Any):
+        # Call after changing a session's game (or to add a new one)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.hot.get(key)
+            if entry is None:  # new sessions are written straight away
+                entry = self.hot[key] = [game, now, float("-inf"), True]
+            else:
+                entry[0], entry[1], entry[3] = game, now, True
+                self.hot.move_to_end(key)
+            if now - entry[2] >= self.flush_seconds:
+                self._write([(key, entry)], now)
+            self._evict(now)
+
+    def delete(self, key: str):
+        with self.lock:
+            self.hot.pop(key, None)
+        self.backend.delete(key)
+
+    def flush(self):
+        with self.lock:
+            self._write([(key, entry) for key, entry in self.hot.items() if entry[3]], time.monotonic())
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+        self.backend.close()
+
+    def __len__(self) -> int:
+        # Live games in memory
+        return len(self.hot)
+
+    def _evict(self, now: float):
+        # Least recently used first, so idle sessions are always at the front
+        cutoff = now - self.idle_seconds
+        evicted = []
+        while self.hot:
+            key, entry = next(iter(self.hot.items()))
+            if len(self.hot) <= self.max_sessions and entry[1] >= cutoff:
+                break
+            del self.hot[key]
+            evicted.append((key, entry))
+        if evicted:
+            metrics.count("session_store_evictions", len(evicted))
+            self._write([item for item in evicted if item[1][3]], now)
+
+    def _write(self, items, now: float):
+        if not items:
+            return
+        with metrics.timer("session_flush"):
+            records = [(key, self.encode(entry[0])) for key, entry in items]
+            self.backend.save_many(records)
+        for key, entry in items:
+            entry[2], entry[3] = now, False
+        for _, record in records:
+            metrics.observe("session_record_bytes", len(record), metrics.BYTES_BUCKETS)
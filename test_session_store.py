@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+import session_store
+from session_store import MemoryBackend, SessionStore, open_backend
+
+
+def encode(game):
+    return json.dumps(game).encode()
+
+
+def decode(record):
+    return json.loads(record)
+
+
+class CountingBackend(MemoryBackend):
+    # Memory backend that remembers every key it was asked to write
+    def __init__(self):
+        super().__init__()
+        self.written = []
+
+    def save_many(self, items):
+        items = list(items)
+        self.written.extend(key for key, _ in items)
+        super().save_many(items)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_store(**kwargs):
+    store = SessionStore(CountingBackend(), encode, decode, **kwargs)
+    session_store.atexit.unregister(store.flush)
+    return store
+
+
+def test_lru_eviction_writes_dirty_games(clock):
+    store = make_store(max_sessions=2)
+    for key in "abc":
+        store.put(key, {"moves": 0})
+        clock[0] += 1
+    assert list(store.hot) == ["b", "c"]
+    store.get("b")  # b is now the most recent
+    game = store.get("a")  # decoded back from its record, evicting c
+    assert game == {"moves": 0} and list(store.hot) == ["b", "a"]
+    game["moves"] = 5
+    store.put("a", game)
+    store.put("d", {"moves": 1})
+    assert list(store.hot) == ["a", "d"]
+    assert decode(store.backend.load("a")) == {"moves": 0}  # the change is not flushed yet
+    store.put("e", {"moves": 2})
+    assert list(store.hot) == ["d", "e"]
+    assert decode(store.backend.load("a")) == {"moves": 5}  # written on eviction
+
+
+def test_idle_sessions_are_evicted(clock):
+    store = make_store(idle_seconds=60)
+    store.put("old", {"moves": 1})
+    clock[0] += 30
+    store.put("recent", {"moves": 2})
+    clock[0] += 40
+    store.put("new", {"moves": 3})
+    assert list(store.hot) == ["recent", "new"]
+    assert decode(store.backend.load("old")) == {"moves": 1}
+
+
+def test_writes_are_batched_per_flush_interval(clock):
+    store = make_store(flush_seconds=5)
+    game = {"moves": 0}
+    store.put("k", game)
+    assert store.backend.written == ["k"]  # new sessions are written straight away
+    for _ in range(10):
+        clock[0] += 0.1
+        game["moves"] += 1
+        store.put("k", game)
+    assert store.backend.written == ["k"]
+    assert decode(store.backend.load("k")) == {"moves": 0}
+    clock[0] += 5
+    game["moves"] += 1
+    store.put("k", game)
+    assert store.backend.written == ["k", "k"]
+    assert decode(store.backend.load("k")) == {"moves": 11}
+    game["moves"] += 1
+    store.put("k", game)
+    store.flush()
+    store.flush()  # nothing dirty the second time
+    assert store.backend.written == ["k", "k", "k"]
+    assert decode(store.backend.load("k")) == {"moves": 12}
+
+
+def test_clean_evictions_are_not_rewritten(clock):
+    store = make_store(max_sessions=1)
+    store.put("a", {"moves": 0})
+    store.put("b", {"moves": 0})
+    store.get("a")
+    store.get("b")
+    assert store.backend.written == ["a", "b"]
+
+
+def test_delete(clock):
+    store = make_store()
+    store.put("a", {"moves": 0})
+    store.delete("a")
+    assert store.get("a") is None and len(store.backend) == 0
+
+
+def test_sqlite_survives_a_restart(tmp_path):
+    spec = f"sqlite:{tmp_path / 'sessions.db'}"
+    store = SessionStore(open_backend(spec), encode, decode, flush_seconds=3600)
+    store.put("a", {"moves": 1})
+    store.put("a", {"moves": 2})  # only in memory until the flush on close
+    store.close()
+    store = SessionStore(open_backend(spec), encode, decode)
+    assert store.get("a") == {"moves": 2}
+    assert store.get("missing") is None
+    store.close()
+
+
+def test_purge_and_bad_specs():
+    backend = MemoryBackend()
+    backend.save_many([("a", b"1")])
+    assert backend.purge(3600) == 0 and backend.purge(-1) == 1
+    with pytest.raises(ValueError):
+        open_backend("redis:somewhere")
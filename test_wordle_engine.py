@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from wordle_engine import (LetterIndex, WordIndex, WordleGame, decode_pattern, encode_words, feedback_pattern,
+                           pattern_matrix, random_words)
+
+
+def small_alphabet_words(num_words, word_length, seed):
+    # Few letters, so most words repeat one and the duplicate-letter rules get exercised
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < num_words:
+        words.add("".join(rng.choice("abcdefg") for _ in range(word_length)))
+    return sorted(words)
+
+
+def hard_mode_ok(word, guess, colors):
+    # Reference hard-mode rule: greens stay in place, revealed letters are reused as often
+    for p, (letter, color) in enumerate(zip(guess, colors)):
+        if color == "green" and word[p] != letter:
+            return False
+    for letter in set(guess):
+        needed = sum(1 for g, color in zip(guess, colors) if g == letter and color != "gray")
+        if word.count(letter) < needed:
+            return False
+    return True
+
+
+@pytest.mark.parametrize("word_length", [3, 5])
+def test_masks_match_brute_force(word_length):
+    words = small_alphabet_words(300, word_length, word_length)
+    index = WordIndex(words, word_length)
+    letters = LetterIndex(index)
+    rng = random.Random(word_length)
+    for _ in range(100):
+        guess, target = rng.choice(words), rng.choice(words)
+        pattern = feedback_pattern(guess, target)
+        colors = decode_pattern(pattern, word_length)
+        expected = [word for word in words if feedback_pattern(guess, word) == pattern]
+        assert letters.words(letters.feedback_mask(guess, colors)) == expected
+        expected = [word for word in words if hard_mode_ok(word, guess, colors)]
+        mask = letters.hard_mode_mask(guess, colors)
+        assert letters.words(mask) == expected
+        assert LetterIndex.count(mask) == len(expected) == len(letters.ids(mask))
+
+
+def test_query():
+    words = small_alphabet_words(300, 5, 0)
+    letters = LetterIndex(WordIndex(words))
+    expected = [word for word in words if word[0] == "a" and "c" in word and word[2] != "c" and "e" not in word]
+    assert letters.words(letters.query(green=[(0, "a")], yellow=[(2, "c")], absent="e")) == expected
+    assert letters.contains(letters.all, words[7]) and not letters.contains(letters.all, "zzzzz")
+
+
+def test_pattern_matrix_matches_feedback():
+    words = small_alphabet_words(60, 5, 1)
+    matrix = pattern_matrix(encode_words(words), encode_words(words))
+    assert all(matrix[i, j] == feedback_pattern(g, t) for i, g in enumerate(words) for j, t in enumerate(words))
+
+
+def test_hard_mode_hints_are_accepted():
+    index = WordIndex(random_words(5000, 2))
+    rng = random.Random(2)
+    for _ in range(10):
+        game = WordleGame(index, index[rng.randrange(len(index))], hard_mode=True)
+        game.guess(index[rng.randrange(len(index))])
+        while game.status == "IN_PROGRESS":
+            hint = game.hint()
+            assert game.hard_mode_error(hint) is None
+            game.guess(hint)
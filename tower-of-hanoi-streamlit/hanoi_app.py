@@ -1,151 +1,337 @@
-from pywebio.input import input
-from pywebio.output import put_text, put_buttons, put_row, put_column, put_html, clear, toast
+from pywebio.input import input, file_upload
+from pywebio.output import (put_text, put_buttons, put_row, put_column, put_html, put_scope, put_code, use_scope, clear,
+                            toast)
+from pywebio.session import download, eval_js, run_js
 from pywebio import start_server
-import time
+import argparse
+import asyncio
+import functools
 import os
+import sys
+from itertools import islice
+# metrics.py and session_store.py are shared with the Wordle app and live in the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics
+from hanoi_engine import (MAX_DISKS, MAX_PEGS, MIN_DISKS, MIN_PEGS, HanoiState, animate_moves, auto_solve_moves,
+                          disk_colors, disk_height, disk_width, frame_stewart_count, hanoi_moves,
+                          optimal_move_count, replay, state_after)
+from hanoi_movelog import LOG_EXTENSION, GameProgress, MoveLog, dump_history
+from session_store import SessionStore
 
-colors = ["red", "orange", "gold", "green", "blue", "indigo", "violet"]
+PEG_HEIGHT = 200  # px of pole the tower has to fit into
 
 class HanoiWeb:
-    def __init__(self):
+    # One instance per browser session; all waiting is done with await so sessions
+    # share the server's event loop instead of each holding a thread
+    def __init__(self, move_delay=0.5, store=None):
         self.num_disks = 0
-        self.pegs = [[], [], []]
+        self.num_pegs = 3
+        self.state = HanoiState(0)
         self.move_count = 0
-        self.move_history = []
+        self.log_prefix = 0  # optimal moves skipped by a jump, not in state.history
         self.selected_peg = None
-        self.allow_autosolve = True
         self.solving = False
-        self.select_disk_count()
+        self.stop_requested = False
+        self.move_delay = move_delay
+        self.exited = asyncio.Event()
+        self.store = store
+        self.session_key = None
+
+    async def run(self):
+        if self.store is not None and await self.resume():
+            self.render()
+        else:
+            await self.select_disk_count()
+        await self.exited.wait()
+
+    async def resume(self):
+        # The session key lives in the tab's sessionStorage, so a reload or a
+        # server restart picks the saved game back up while other tabs get their own
+        self.session_key = await eval_js("sessionStorage.getItem('hanoi_session')")
+        progress = self.store.get(self.session_key) if self.session_key else None
+        if progress is None:
+            self.session_key = self.store.new_key()
+            run_js("sessionStorage.setItem('hanoi_session', key)", key=self.session_key)
+            return False
+        # Decoded copy, so a duplicated tab never moves disks on this connection's board
+        progress = GameProgress.from_record(progress.to_record())
+        self.state = progress.state
+        self.num_disks = progress.state.num_disks
+        self.num_pegs = progress.state.num_pegs
+        self.move_count = progress.move_count
+        self.log_prefix = progress.log_prefix
+        toast(f"Resumed your game at move {self.move_count}.", color='info')
+        return True
+
+    def save(self):
+        # Cheap enough for every move: the store only writes every few seconds
+        if self.store is not None and self.session_key:
+            self.store.put(self.session_key, GameProgress(self.state, self.move_count, self.log_prefix))
 
     def setup(self):
-        self.pegs = [list(range(self.num_disks, 0, -1)), [], []]
+        self.state = HanoiState(self.num_disks, self.num_pegs)
         self.move_count = 0
-        self.move_history = []
+        self.log_prefix = 0
         self.selected_peg = None
-        self.allow_autosolve = True
         self.solving = False
+        self.save()
         self.render()
 
+    def peg_html(self, peg):
+        colors = disk_colors(self.num_disks)
+        # Each disk also takes 4px of margin, so budget that out of the pole height
+        height = disk_height(self.num_disks, PEG_HEIGHT, 24, 5) - 4
+        html = f"""
+            <div style='position: relative; height: {PEG_HEIGHT + 20}px; width: 120px; border: 2px solid black; padding-top: 10px; display: flex; flex-direction: column-reverse; align-items: center; background-color: #f5f5f5;'>
+                <div style='position: absolute; bottom: 10px; left: 50%; transform: translateX(-50%); width: 8px; height: {PEG_HEIGHT}px; background-color: #444; border-radius: 4px; z-index: 0;'></div>
+            """
+        for disk in self.state.peg_disks(peg):
+            width = disk_width(disk, self.num_disks, 40, 160)
+            color = colors[disk - 1]
+            html += f"<div style='margin: 2px; height: {height}px; width: {width}px; background:{color}; border-radius: 5px; z-index: 1; position: relative;'></div>"
+        html += "</div>"
+        metrics.observe_size("peg_html_bytes", html)
+        return html
+
+    def moves_text(self):
+        return f"Moves: {self.move_count} | Optimal: {frame_stewart_count(self.num_disks, self.num_pegs)}"
+
+    @metrics.timed("render")
     def render(self):
+        # Full page build; only needed when the layout changes (new game, solve start/end)
         clear()
         put_html("<h2 style='text-align:center;'>Tower of Hanoi</h2>")
-        put_text(f"Moves: {self.move_count} | Optimal: {2**self.num_disks - 1}")
+        put_scope('moves', [put_text(self.moves_text())])
 
         peg_outputs = []
-        for i in range(3):
-            peg_html = """
-            <div style='position: relative; height: 220px; width: 120px; border: 2px solid black; padding-top: 10px; display: flex; flex-direction: column-reverse; align-items: center; background-color: #f5f5f5;'>
-                <div style='position: absolute; bottom: 10px; left: 50%; transform: translateX(-50%); width: 8px; height: 200px; background-color: #444; border-radius: 4px; z-index: 0;'></div>
-            """
-            for disk in self.pegs[i]:
-                disk_width = 20 + disk * 20
-                color = colors[disk - 1]
-                peg_html += f"<div style='margin: 2px; height: 20px; width: {disk_width}px; background:{color}; border-radius: 5px; z-index: 1; position: relative;'></div>"
-            peg_html += "</div>"
-
-            peg_column = [put_html(peg_html)]
+        for i in range(self.num_pegs):
+            peg_column = [put_scope(f'peg{i}', [put_html(self.peg_html(i))])]
             if not self.solving:
                 def make_handler(peg_idx):
                     return lambda btn_val=None: self.handle_click(peg_idx)
                 peg_column.append(put_buttons([f"Select Peg {i+1}"], [make_handler(i)], small=True))
 
-            peg_outputs.append(put_column(peg_column, scope=f'peg{i}'))
+            peg_outputs.append(put_column(peg_column))
 
         put_row(peg_outputs, size='auto')
         put_html("<div style='margin-top: 10px;'></div>")
 
         if not self.solving:
             put_row([
-                put_buttons(['Undo', 'Reset', 'Auto Solve', 'Disk Selection', 'Exit'],
-                            [self.undo_move, self.setup, self.auto_solve, self.go_to_disk_selection, self.exit_game])
+                put_buttons(['Undo', 'Reset', 'Auto Solve', 'Jump to Move', 'Export Log', 'Import Log', 'Disk Selection', 'Exit'],
+                            [self.undo_move, self.setup, self.auto_solve, self.jump_to_move, self.export_log, self.import_log,
+                             self.go_to_disk_selection, self.exit_game])
+            ], size='auto')
+        else:
+            put_row([
+                put_buttons(['Stop', 'Exit'], [self.stop_solve, self.exit_game])
             ], size='auto')
 
+    @metrics.timed("render_pegs")
+    def render_pegs(self, *pegs):
+        # Per-move update: re-send the move counter and the pegs the move touched,
+        # leaving the header and button rows in place
+        with use_scope('moves', clear=True):
+            put_text(self.moves_text())
+        for i in set(pegs):
+            with use_scope(f'peg{i}', clear=True):
+                put_html(self.peg_html(i))
+
     def handle_click(self, peg_idx):
         if self.solving:
             return  # Ignore clicks during auto solve
         if self.selected_peg is None:
-            if self.pegs[peg_idx]:
+            if self.state.top(peg_idx):
                 self.selected_peg = peg_idx
                 toast(f"Selected Peg {peg_idx+1}", color='info')
         else:
             if self.selected_peg != peg_idx:
                 self.move_disk(self.selected_peg, peg_idx)
+                self.render_pegs(self.selected_peg, peg_idx)
             else:
                 toast("Cancelled selection", color='warning')
             self.selected_peg = None
-            self.render()
 
+    @metrics.timed("move_disk")
     def move_disk(self, from_peg, to_peg):
-        if not self.pegs[from_peg]:
+        if not self.state.top(from_peg):
             return
-        if self.pegs[to_peg] and self.pegs[to_peg][-1] < self.pegs[from_peg][-1]:
+        if not self.state.can_move(from_peg, to_peg):
             toast("Invalid move: larger disk on smaller one", color='error')
             return
 
-        disk = self.pegs[from_peg].pop()
-        self.pegs[to_peg].append(disk)
+        self.state.move(from_peg, to_peg)
         self.move_count += 1
-        self.move_history.append((disk, from_peg, to_peg))
-        self.allow_autosolve = False  # Disable auto solve after a manual move
+        self.save()
 
-        if len(self.pegs[2]) == self.num_disks:
+        if self.state.is_solved(self.target_peg):
             toast(f"🎉 You solved it in {self.move_count} moves!", color='success')
 
-    def select_disk_count(self):
+    async def select_disk_count(self):
         while True:
-            user_input = input("Enter number of disks (3-7):")
+            user_input = await input(f"Enter number of disks ({MIN_DISKS}-{MAX_DISKS}):")
             try:
                 count = int(user_input)
-                if 3 <= count <= 7:
+                if MIN_DISKS <= count <= MAX_DISKS:
                     self.num_disks = count
                     break
                 else:
-                    toast("Please enter a number between 3 and 7.", color='warn')
+                    toast(f"Please enter a number between {MIN_DISKS} and {MAX_DISKS}.", color='warn')
+            except:
+                toast("Invalid input. Please enter a number.", color='error')
+
+        while True:
+            user_input = await input(f"Enter number of pegs ({MIN_PEGS}-{MAX_PEGS}):", value="3")
+            try:
+                count = int(user_input)
+                if MIN_PEGS <= count <= MAX_PEGS:
+                    self.num_pegs = count
+                    break
+                else:
+                    toast(f"Please enter a number between {MIN_PEGS} and {MAX_PEGS}.", color='warn')
             except:
                 toast("Invalid input. Please enter a number.", color='error')
 
         self.setup()
 
-    def go_to_disk_selection(self, _=None):
-        self.select_disk_count()
+    @property
+    def target_peg(self):
+        return self.num_pegs - 1
+
+    async def go_to_disk_selection(self, _=None):
+        await self.select_disk_count()
 
     def undo_move(self):
-        if not self.move_history:
+        undone = self.state.undo()
+        if not undone:
             return
-        disk, from_peg, to_peg = self.move_history.pop()
-        self.pegs[to_peg].pop()
-        self.pegs[from_peg].append(disk)
+        _, from_peg, to_peg = undone
         self.move_count -= 1
+        self.save()
+        self.render_pegs(from_peg, to_peg)
+
+    async def jump_to_move(self, _=None):
+        if self.num_pegs != 3:
+            toast("Jump to Move is only available with 3 pegs.", color='warn')
+            return
+        total = optimal_move_count(self.num_disks)
+        user_input = await input(f"Jump to move (0-{total}):")
+        try:
+            k = int(user_input)
+        except ValueError:
+            toast("Invalid input. Please enter a number.", color='error')
+            return
+        if not 0 <= k <= total:
+            toast(f"Please enter a number between 0 and {total}.", color='warn')
+            return
+
+        # Board is computed from the bits of k, no replay of the earlier moves
+        self.state = HanoiState.from_pegs(state_after(self.num_disks, k, 0, 2, 1))
+        self.move_count = k
+        self.log_prefix = k
+        self.selected_peg = None
+        self.save()
+        self.render()
+
+    def export_log(self, _=None):
+        # Whole game as a compact binary log, from the starting tower
+        prefix = islice(hanoi_moves(self.num_disks), self.log_prefix)
+        data = dump_history(self.state.history, self.num_disks, self.num_pegs, prefix)
+        download(f"hanoi_{self.num_disks}d_{self.num_pegs}p{LOG_EXTENSION}", data)
+
+    async def import_log(self, _=None):
+        upload = await file_upload("Move log to replay:", accept=LOG_EXTENSION)
+        if not upload:
+            return
+        try:
+            log = MoveLog(upload['content'])
+        except ValueError as e:
+            toast(str(e), color='error')
+            return
+        if not (MIN_DISKS <= log.num_disks <= MAX_DISKS and MIN_PEGS <= log.num_pegs <= MAX_PEGS):
+            toast(f"Log is for {log.num_disks} disks on {log.num_pegs} pegs, which this game does not support.",
+                  color='error')
+            return
+
+        # Replayed with history kept, so the imported moves can be undone like played ones
+        result = replay(log, log.num_disks, log.num_pegs, record=True)
+        if result.illegal_at is not None:
+            toast(f"Move {result.illegal_at} in the log is illegal; import cancelled.", color='error')
+            return
+        self.num_disks = log.num_disks
+        self.num_pegs = log.num_pegs
+        self.state = result.state
+        self.move_count = result.moves
+        self.log_prefix = 0
+        self.selected_peg = None
+        self.save()
         self.render()
+        toast(f"Replayed {result.moves} moves.", color='success')
 
-    def auto_solve(self):
-        if not self.allow_autosolve:
-            toast("⚠️ Auto Solve is only available at the start or after Reset.", color='warn')
+    async def auto_solve(self):
+        try:
+            moves = auto_solve_moves(self.state.to_pegs(), self.target_peg)
+        except ValueError as e:
+            toast(str(e), color='warn')
             return
 
+        self.selected_peg = None
         self.solving = True
+        self.stop_requested = False
         self.render()
 
-        def solve(n, src, dest, aux):
-            if n == 0:
-                return
-            solve(n - 1, src, aux, dest)
-            time.sleep(0.5)
-            self.move_disk(src, dest)
-            self.render()
-            solve(n - 1, aux, dest, src)
+        def apply_move(src, dest):
+            with metrics.timer("solve_frame"):
+                self.move_disk(src, dest)
+                self.render_pegs(src, dest)
+
+        await animate_moves(moves, apply_move, self.move_delay, lambda: self.stop_requested)
 
-        solve(self.num_disks, 0, 2, 1)
         self.solving = False
-        self.render()
+        if not self.exited.is_set():
+            self.render()
+
+    def stop_solve(self, _=None):
+        self.stop_requested = True
 
     def exit_game(self, _=None):
-        toast("Exiting game...", color='warn')
-        time.sleep(0.5)
-        os._exit(0)
+        # Ends this session only; other players on the server are unaffected
+        self.stop_requested = True
+        clear()
+        put_text("Thanks for playing! You can close this tab.")
+        self.exited.set()
+
+async def main(move_delay=0.5, store=None):
+    with metrics.session():
+        await HanoiWeb(move_delay, store).run()
+
+async def metrics_page():
+    # Served at ?app=metrics when started with --metrics
+    put_html("<h3>Tower of Hanoi metrics</h3>")
+    put_scope('metrics', [put_code(metrics.exposition("hanoi"))])
+    put_buttons(['Refresh'], [refresh_metrics])
 
-def main():
-    HanoiWeb()
+def refresh_metrics(_=None):
+    with use_scope('metrics', clear=True):
+        put_code(metrics.exposition("hanoi"))
 
 if __name__ == '__main__':
-    start_server(main, port=8080, debug=True)
+    parser = argparse.ArgumentParser(description="Tower of Hanoi web app")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds between auto-solve moves")
+    parser.add_argument("--metrics", action="store_true", help="record timings and serve them at ?app=metrics")
+    parser.add_argument("--session-store", help="sqlite:<file> or memory (default: APP_SESSION_STORE, "
+                                                "else sqlite:hanoi_sessions.db)")
+    parser.add_argument("--no-sessions", action="store_true", help="do not save or resume games")
+    args = parser.parse_args()
+    if args.session_store:
+        os.environ["APP_SESSION_STORE"] = args.session_store
+    store = None
+    if not args.no_sessions:
+        store = SessionStore.from_env("hanoi_sessions.db", GameProgress.to_record, GameProgress.from_record)
+    game = functools.partial(main, args.delay, store=store)
+    if args.metrics or metrics.ENABLED:
+        metrics.enable()
+        start_server({'index': game, 'metrics': metrics_page}, port=args.port, debug=True)
+    else:
+        start_server(game, port=args.port, debug=True)
@@ -1,114 +1,246 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import os
+import sys
 import time
+from itertools import islice
+# metrics.py and session_store.py are shared with the Wordle app and live in the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics
+from hanoi_engine import (MAX_DISKS, MAX_PEGS, MIN_DISKS, MIN_PEGS, HanoiState, auto_solve_moves, disk_colors,
+                          disk_height, disk_width, frame_stewart_count, hanoi_moves, optimal_move_count, replay,
+                          state_after)
+from hanoi_movelog import LOG_EXTENSION, GameProgress, MoveLog, dump_history
+from session_store import SessionStore
 
 # Constants
-PEG_COUNT = 3
-COLORS = ["#ff4b4b", "#ffa500", "#ffd700", "#32cd32", "#1e90ff", "#4b0082", "#ee82ee"]
+PEG_HEIGHT = 200
+
+# Saved games: hot ones live in memory, the rest in SQLite, keyed by ?session=...
+@st.cache_resource
+def session_store():
+    return SessionStore.from_env("hanoi_sessions.db", GameProgress.to_record, GameProgress.from_record)
+
+store = session_store()
+
+def game() -> GameProgress:
+    # Board and move counters of this session; st.session_state keeps only the key
+    progress = store.get(st.session_state.session_key)
+    if progress is None:
+        initialize_state()
+        progress = store.get(st.session_state.session_key)
+    return progress
+
+def save_game(progress):
+    store.put(st.session_state.session_key, progress)
 
 # Initialize session state
 def initialize_state():
-    st.session_state.pegs = [[i for i in range(st.session_state.num_disks, 0, -1)], [], []]
+    save_game(GameProgress(HanoiState(st.session_state.num_disks, st.session_state.num_pegs)))
     st.session_state.selected_peg = None
-    st.session_state.move_count = 0
     st.session_state.solving = False
-    st.session_state.auto_moves = []
     st.session_state.last_num_disks = st.session_state.num_disks
+    st.session_state.last_num_pegs = st.session_state.num_pegs
+
+def target_peg():
+    return st.session_state.num_pegs - 1
 
 # Valid move
 def is_valid_move(from_peg, to_peg):
-    if not st.session_state.pegs[from_peg]:
-        return False
-    if not st.session_state.pegs[to_peg]:
-        return True
-    return st.session_state.pegs[from_peg][-1] < st.session_state.pegs[to_peg][-1]
+    return game().state.can_move(from_peg, to_peg)
 
 # Move disk
+@metrics.timed("move_disk")
 def move_disk(from_peg, to_peg):
     if is_valid_move(from_peg, to_peg):
-        disk = st.session_state.pegs[from_peg].pop()
-        st.session_state.pegs[to_peg].append(disk)
-        st.session_state.move_count += 1
+        progress = game()
+        progress.state.move(from_peg, to_peg)
+        progress.move_count += 1
+        save_game(progress)
 
 # Handle clicks
 def handle_peg_click(peg_index):
     if st.session_state.selected_peg is None:
-        if st.session_state.pegs[peg_index]:  # Select only if peg has disk
+        if game().state.top(peg_index):  # Select only if peg has disk
             st.session_state.selected_peg = peg_index
     else:
         if st.session_state.selected_peg != peg_index:
             move_disk(st.session_state.selected_peg, peg_index)
         st.session_state.selected_peg = None
 
-# Draw the game
+# Peg markup
+def peg_html(i):
+    peg_disks = game().state.peg_disks(i)
+    is_selected = st.session_state.selected_peg == i
+    num_disks = st.session_state.num_disks
+    colors = disk_colors(num_disks)
+    step = disk_height(num_disks, PEG_HEIGHT, 25, 3)  # Vertical pitch, disk plus gap
+    height = step * 4 // 5
+
+    html = "<div style='height: 250px; position: relative;'>"
+    html += "<div style='position: absolute; bottom: 0; left: 50%; transform: translateX(-50%); width: 6px; height: 200px; background-color: black;'></div>"
+
+    for idx, disk in enumerate(reversed(peg_disks)):  # Top to bottom
+        width = disk_width(disk, num_disks, 40, 160)
+        color = colors[disk - 1]
+        top_position = PEG_HEIGHT - height - (idx * step)
+        border = "4px solid yellow" if is_selected and idx == 0 else "none"
+        html += f"<div style='position: absolute; top: {top_position}px; left: 50%; transform: translateX(-50%); background: {color}; width: {width}px; height: {height}px; border-radius: 5px; border: {border};'></div>"
+
+    html += "</div>"
+    metrics.observe_size("peg_html_bytes", html)
+    return html
+
+def moves_text():
+    return f"Moves: {game().move_count} | Optimal: {frame_stewart_count(st.session_state.num_disks, st.session_state.num_pegs)}"
+
+# Draw the game; returns one placeholder per peg so frames can redraw single pegs
+@metrics.timed("render_game")
 def render_game():
-    cols = st.columns(PEG_COUNT)
-    for i in range(PEG_COUNT):
+    cols = st.columns(st.session_state.num_pegs)
+    peg_slots = []
+    for i in range(st.session_state.num_pegs):
         with cols[i]:
-            peg_disks = st.session_state.pegs[i]
-            is_selected = st.session_state.selected_peg == i
+            slot = st.empty()
+            slot.markdown(peg_html(i), unsafe_allow_html=True)
+            peg_slots.append(slot)
 
-            peg_html = "<div style='height: 250px; position: relative;'>"
-            peg_html += "<div style='position: absolute; bottom: 0; left: 50%; transform: translateX(-50%); width: 6px; height: 200px; background-color: black;'></div>"
+            if st.button(" ", key=f"peg_click_{i}", disabled=st.session_state.solving):
+                handle_peg_click(i)
+    return peg_slots
 
-            for idx, disk in enumerate(reversed(peg_disks)):  # Top to bottom
-                disk_width = 20 + disk * 20
-                color = COLORS[disk - 1]
-                top_position = 180 - (idx * 25)
-                border = "4px solid yellow" if is_selected and idx == 0 else "none"
-                peg_html += f"<div style='position: absolute; top: {top_position}px; left: 50%; transform: translateX(-50%); background: {color}; width: {disk_width}px; height: 20px; border-radius: 5px; border: {border};'></div>"
+# Solve logic
+def auto_solve(status_slot, peg_slots, delay):
+    # Plays the whole solution inside this script run: each frame rewrites only the
+    # move counter and the two pegs it touched, with no st.rerun() per move. The
+    # stream is rebuilt from the board on every run, so if the run is interrupted
+    # by another widget the next run picks up exactly where the board is.
+    try:
+        moves = auto_solve_moves(game().state.to_pegs(), target_peg())
+    except ValueError as e:
+        st.session_state.solving = False
+        st.warning(str(e))
+        return
+
+    for from_peg, to_peg in moves:
+        time.sleep(delay)
+        with metrics.timer("solve_frame"):
+            move_disk(from_peg, to_peg)
+            status_slot.write(moves_text())
+            peg_slots[from_peg].markdown(peg_html(from_peg), unsafe_allow_html=True)
+            peg_slots[to_peg].markdown(peg_html(to_peg), unsafe_allow_html=True)
+    st.session_state.solving = False
+    st.rerun()
 
-            peg_html += "</div>"
-            st.markdown(peg_html, unsafe_allow_html=True)
+# Seek along the optimal solution
+def jump_to_move(k):
+    save_game(GameProgress(HanoiState.from_pegs(state_after(st.session_state.num_disks, k, 0, 2, 1)), k, k))
+    st.session_state.selected_peg = None
+    st.session_state.solving = False
 
-            if st.button(" ", key=f"peg_click_{i}"):
-                handle_peg_click(i)
+# Move log export/import
+def export_log():
+    # Built only when the download is clicked, not on every rerun
+    progress = game()
+    prefix = islice(hanoi_moves(st.session_state.num_disks), progress.log_prefix)
+    return dump_history(progress.state.history, st.session_state.num_disks, st.session_state.num_pegs, prefix)
+
+def import_log():
+    # on_change callback, so it runs before the sliders read num_disks/num_pegs
+    upload = st.session_state.log_upload
+    if upload is None:
+        return
+    try:
+        log = MoveLog(upload.getvalue())
+    except ValueError as e:
+        st.error(str(e))
+        return
+    if not (MIN_DISKS <= log.num_disks <= MAX_DISKS and MIN_PEGS <= log.num_pegs <= MAX_PEGS):
+        st.error(f"Log is for {log.num_disks} disks on {log.num_pegs} pegs, which this game does not support.")
+        return
+    result = replay(log, log.num_disks, log.num_pegs, record=True)
+    if result.illegal_at is not None:
+        st.error(f"Move {result.illegal_at} in the log is illegal; import cancelled.")
+        return
+    st.session_state.num_disks = log.num_disks
+    st.session_state.num_pegs = log.num_pegs
+    initialize_state()
+    save_game(GameProgress(result.state, result.moves))
 
-# Solve logic
-def generate_hanoi_moves(n, src, dest, aux, moves):
-    if n == 1:
-        moves.append((src, dest))
-    else:
-        generate_hanoi_moves(n - 1, src, aux, dest, moves)
-        moves.append((src, dest))
-        generate_hanoi_moves(n - 1, aux, dest, src, moves)
-
-def auto_solve():
-    if not st.session_state.solving:
-        st.session_state.auto_moves = []
-        generate_hanoi_moves(st.session_state.num_disks, 0, 2, 1, st.session_state.auto_moves)
-        st.session_state.solving = True
-
-    if st.session_state.auto_moves:
-        from_peg, to_peg = st.session_state.auto_moves.pop(0)
-        move_disk(from_peg, to_peg)
-        time.sleep(0.3)
-        st.rerun()
+# Local metrics page at ?metrics when started with APP_METRICS=1
+if metrics.ENABLED:
+    if "metrics" in st.query_params:
+        st.code(metrics.exposition("hanoi"), language="text")
+        st.stop()
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        metrics.session_seen(ctx.session_id)
 
 # Sidebar controls
 st.sidebar.title("Tower of Hanoi Settings")
 
+# Resume the game named in the URL, if the store still has it. A new browser
+# session (reload, copied link, duplicated tab) continues from a private copy
+# under a fresh key, so two sessions never move disks on one live board.
+if "session_key" not in st.session_state:
+    key = st.query_params.get("session")
+    progress = store.get(key) if key else None
+    key = store.new_key()
+    st.query_params["session"] = key
+    if progress is not None:
+        progress = GameProgress.from_record(progress.to_record())
+        store.put(key, progress)
+        st.session_state.num_disks = st.session_state.last_num_disks = progress.state.num_disks
+        st.session_state.num_pegs = st.session_state.last_num_pegs = progress.state.num_pegs
+        st.session_state.selected_peg = None
+        st.session_state.solving = False
+    st.session_state.session_key = key
+
 if "num_disks" not in st.session_state:
     st.session_state.num_disks = 3
+if "num_pegs" not in st.session_state:
+    st.session_state.num_pegs = 3
 
-st.session_state.num_disks = st.sidebar.slider("Number of Disks", 3, 7, st.session_state.num_disks)
+st.session_state.num_disks = st.sidebar.slider("Number of Disks", MIN_DISKS, MAX_DISKS, st.session_state.num_disks)
+st.session_state.num_pegs = st.sidebar.slider("Number of Pegs", MIN_PEGS, MAX_PEGS, st.session_state.num_pegs)
 
-if "last_num_disks" not in st.session_state or st.session_state.num_disks != st.session_state.get("last_num_disks", 0):
+if (st.session_state.num_disks != st.session_state.get("last_num_disks", 0)
+        or st.session_state.num_pegs != st.session_state.get("last_num_pegs", 0)):
     initialize_state()
 
 if st.sidebar.button("Reset Game"):
     initialize_state()
 
+if st.session_state.num_pegs == 3:
+    jump_target = st.sidebar.number_input("Jump to Move", 0, optimal_move_count(st.session_state.num_disks), 0)
+    if st.sidebar.button("Jump"):
+        jump_to_move(int(jump_target))
+
+st.sidebar.download_button("Export Move Log", export_log,
+                           file_name=f"hanoi_{st.session_state.num_disks}d_{st.session_state.num_pegs}p{LOG_EXTENSION}",
+                           mime="application/octet-stream", on_click="ignore")
+st.sidebar.file_uploader("Import Move Log", type=[LOG_EXTENSION.lstrip(".")], key="log_upload", on_change=import_log)
+
+moves_per_second = st.sidebar.slider("Solve Speed (moves/sec)", 1, 30, 3)
+
 if st.sidebar.button("Auto Solve"):
-    auto_solve()
+    st.session_state.selected_peg = None
+    st.session_state.solving = True
+
+if st.sidebar.button("Stop"):
+    st.session_state.solving = False
 
 # Game title and status
 st.title("Tower of Hanoi")
-optimal_moves = 2 ** st.session_state.num_disks - 1
-st.write(f"Moves: {st.session_state.move_count} | Optimal: {optimal_moves}")
+status_slot = st.empty()
+status_slot.write(moves_text())
+
+peg_slots = render_game()
 
-render_game()
+if st.session_state.solving:
+    auto_solve(status_slot, peg_slots, 1 / moves_per_second)
 
 # Win condition
-if len(st.session_state.pegs[2]) == st.session_state.num_disks:
-    st.success(f"🎉 Congratulations! You solved it in {st.session_state.move_count} moves.")
+if game().state.is_solved(target_peg()):
+    st.success(f"🎉 Congratulations! You solved it in {game().move_count} moves.")
     st.session_state.solving = False
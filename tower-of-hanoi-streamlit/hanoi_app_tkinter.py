@@ -1,8 +1,30 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
-import winsound
+from tkinter import filedialog, messagebox, simpledialog
+import itertools
+import queue
 import time
 import threading
+from hanoi_engine import (MAX_DISKS, MAX_PEGS, MIN_DISKS, MIN_PEGS, HanoiState, auto_solve_moves, disk_colors,
+                          disk_height, disk_width, frame_stewart_count, replay)
+from hanoi_movelog import LOG_EXTENSION, MoveLog, MoveLogWriter
+
+try:
+    import winsound
+except ImportError:  # Not available outside Windows; fall back to the Tk bell
+    winsound = None
+
+# Auto-solve animation
+MOVE_FRAME_MS = 400     # one move per frame in normal mode
+TURBO_FRAME_MS = 16     # turbo applies as many moves as fit in the frame budget
+TURBO_BUDGET = 0.010    # seconds of move work per turbo frame
+MOVE_QUEUE_SIZE = 4096  # producer runs at most this far ahead of the animation
+
+# Board geometry: disks sit on a 360px base line, pegs run from y=150 to y=350
+CANVAS_WIDTH = 600
+BASE_Y = 360
+STACK_HEIGHT = 210
+MIN_DISK_WIDTH = 30
+MAX_DISK_WIDTH = 140    # stays narrower than the 150px spacing of three pegs
 
 
 class HanoiGame:
@@ -16,7 +38,7 @@ class HanoiGame:
         self.title_label.pack(pady=10)
 
         # Canvas for game
-        self.canvas = tk.Canvas(root, width=600, height=400, bg="white")
+        self.canvas = tk.Canvas(root, width=CANVAS_WIDTH, height=400, bg="white")
         self.canvas.pack()
 
         # Controls
@@ -38,12 +60,30 @@ class HanoiGame:
         self.solve_button = tk.Button(self.controls_frame, text="Auto Solve", command=self.start_auto_solver)
         self.solve_button.pack(side="left", padx=10)
 
+        self.sound_enabled = tk.BooleanVar(value=True)
+        self.sound_check = tk.Checkbutton(self.controls_frame, text="Sound", variable=self.sound_enabled)
+        self.sound_check.pack(side="left", padx=5)
+
+        self.turbo_enabled = tk.BooleanVar(value=False)
+        self.turbo_check = tk.Checkbutton(self.controls_frame, text="Turbo", variable=self.turbo_enabled)
+        self.turbo_check.pack(side="left", padx=5)
+
+        # Move log export/import
+        self.log_frame = tk.Frame(root)
+        self.log_frame.pack()
+
+        self.export_button = tk.Button(self.log_frame, text="Export Log", command=self.export_log)
+        self.export_button.pack(side="left", padx=10)
+
+        self.import_button = tk.Button(self.log_frame, text="Import Log", command=self.import_log)
+        self.import_button.pack(side="left", padx=10)
+
         # Pegs & Disk Settings
-        self.colors = ["red", "orange", "gold", "green", "blue", "indigo", "violet"]
-        self.peg_x = [150, 300, 450]
         self.canvas.bind("<Button-1>", self.handle_click)
 
         self.interaction_enabled = True
+        self.solver_stop = threading.Event()
+        self.move_queue = None
         self.start_game()
 
     def center_window(self, width, height):
@@ -54,14 +94,30 @@ class HanoiGame:
         self.root.geometry(f"{width}x{height}+{x}+{y}")
 
     def start_game(self):
-        self.num_disks = simpledialog.askinteger("Number of Disks", "Enter number of disks (3-7):", minvalue=3, maxvalue=7)
+        self.num_disks = simpledialog.askinteger("Number of Disks", f"Enter number of disks ({MIN_DISKS}-{MAX_DISKS}):",
+                                                 minvalue=MIN_DISKS, maxvalue=MAX_DISKS)
         if not self.num_disks:
             self.root.destroy()
             return
-
-        self.move_count = 0
-        self.pegs = [[], [], []]
-        self.move_history = []
+        self.num_pegs = simpledialog.askinteger("Number of Pegs", f"Enter number of pegs ({MIN_PEGS}-{MAX_PEGS}):",
+                                                initialvalue=3, minvalue=MIN_PEGS, maxvalue=MAX_PEGS)
+        if not self.num_pegs:
+            self.root.destroy()
+            return
+        self.new_board(HanoiState(self.num_disks, self.num_pegs))
+
+    def new_board(self, state, move_count=0):
+        self.num_disks = state.num_disks
+        self.num_pegs = state.num_pegs
+
+        # Pegs spread evenly across the canvas; disks shrink to fit between them
+        self.peg_spacing = CANVAS_WIDTH // (self.num_pegs + 1)
+        self.peg_x = [self.peg_spacing * (i + 1) for i in range(self.num_pegs)]
+        self.max_disk_width = min(MAX_DISK_WIDTH, self.peg_spacing - 10)
+        self.move_count = move_count
+        self.disk_h = disk_height(self.num_disks, STACK_HEIGHT)
+        self.state = state
+        self.disk_items = {}
         self.selected_disk = None
         self.source_peg = None
         self.canvas.delete("all")
@@ -74,17 +130,27 @@ class HanoiGame:
             self.canvas.create_rectangle(x - 5, 150, x + 5, 350, fill="black")
 
     def create_disks(self):
-        for size in range(self.num_disks, 0, -1):
-            width = size * 30
-            x = self.peg_x[0]
-            y = 340 - len(self.pegs[0]) * 20
-            color = self.colors[size - 1]
-            rect = self.canvas.create_rectangle(x - width // 2, y, x + width // 2, y + 20, fill=color)
-            self.pegs[0].append((rect, size, color))
+        colors = disk_colors(self.num_disks)
+        for peg in range(self.num_pegs):
+            for level, size in enumerate(self.state.peg_disks(peg)):
+                rect = self.canvas.create_rectangle(*self.disk_coords(size, peg, level), fill=colors[size - 1])
+                self.disk_items[size] = rect
+
+    def disk_coords(self, size, peg, level):
+        width = disk_width(size, self.num_disks, min(MIN_DISK_WIDTH, self.max_disk_width), self.max_disk_width)
+        x = self.peg_x[peg]
+        y = BASE_Y - (level + 1) * self.disk_h
+        return x - width // 2, y, x + width // 2, y + self.disk_h
+
+    def place_disk(self, size, peg):
+        # Draw the disk at the top of the peg it now sits on in self.state
+        rect = self.disk_items[size]
+        self.canvas.itemconfig(rect, outline="", width=1)
+        self.canvas.coords(rect, *self.disk_coords(size, peg, self.state.height(peg) - 1))
 
     def update_move_labels(self):
         self.move_label.config(text=f"Moves: {self.move_count}")
-        optimal = 2 ** self.num_disks - 1
+        optimal = frame_stewart_count(self.num_disks, self.num_pegs)
         self.optimal_label.config(text=f"Optimal Moves: {optimal}")
 
     def handle_click(self, event):
@@ -96,104 +162,173 @@ class HanoiGame:
             return
 
         if self.selected_disk is None:
-            if self.pegs[clicked_peg]:
-                self.selected_disk = self.pegs[clicked_peg][-1]
+            if self.state.top(clicked_peg):
+                self.selected_disk = self.state.top(clicked_peg)
                 self.source_peg = clicked_peg
-                self.canvas.itemconfig(self.selected_disk[0], outline="black", width=2)
+                self.canvas.itemconfig(self.disk_items[self.selected_disk], outline="black", width=2)
         else:
-            if self.can_place(self.selected_disk[1], clicked_peg):
+            if self.can_place(self.source_peg, clicked_peg):
                 self.move_disk(self.source_peg, clicked_peg)
                 self.move_count += 1
                 self.update_move_labels()
                 self.check_win()
             else:
                 messagebox.showinfo("Invalid Move", "You can't place a larger disk on a smaller one.")
-                self.canvas.itemconfig(self.selected_disk[0], outline="", width=1)
+                self.canvas.itemconfig(self.disk_items[self.selected_disk], outline="", width=1)
             self.selected_disk = None
             self.source_peg = None
 
     def get_peg_from_x(self, x):
-        for i in range(3):
-            if abs(x - self.peg_x[i]) < 50:
+        for i in range(self.num_pegs):
+            if abs(x - self.peg_x[i]) < self.peg_spacing // 3:
                 return i
         return None
 
-    def can_place(self, disk_size, peg):
-        if not self.pegs[peg]:
-            return True
-        return disk_size < self.pegs[peg][-1][1]
+    def can_place(self, from_peg, to_peg):
+        # Size rule plus any variant rule the board was created with
+        return self.state.can_move(from_peg, to_peg)
 
     def move_disk(self, from_peg, to_peg, record=True, play_sound=True):
-        if not self.pegs[from_peg]:
+        disk_size = self.state.top(from_peg)
+        if not disk_size:
             return  # Nothing to move
 
-        disk = self.pegs[from_peg][-1]
-        disk_size = disk[1]
-
-        if self.pegs[to_peg] and self.pegs[to_peg][-1][1] < disk_size:
-            print(f"Invalid move: Trying to place disk {disk_size} on smaller disk {self.pegs[to_peg][-1][1]}")
+        if not self.state.can_move(from_peg, to_peg):
+            print(f"Invalid move: Trying to place disk {disk_size} on smaller disk {self.state.top(to_peg)}")
             return  # Prevent invalid move
 
-        disk = self.pegs[from_peg].pop()
-        self.canvas.itemconfig(disk[0], outline="", width=1)
-        x = self.peg_x[to_peg]
-        y = 340 - len(self.pegs[to_peg]) * 20
-        width = disk[1] * 30
-        self.canvas.coords(disk[0], x - width // 2, y, x + width // 2, y + 20)
-        self.pegs[to_peg].append(disk)
-
-        if record:
-            self.move_history.append((disk, from_peg, to_peg))
+        self.state.move(from_peg, to_peg, record=record)
+        self.place_disk(disk_size, to_peg)
 
         if play_sound:
-            winsound.Beep(440 + 40 * disk[1], 100)
+            self.play_sound(disk_size)
+
+    def play_sound(self, disk_size):
+        # Never blocks the Tk thread: winsound.Beep runs on a short-lived thread
+        if not self.sound_enabled.get():
+            return
+        if winsound is not None:
+            threading.Thread(target=winsound.Beep, args=(440 + 40 * disk_size, 100), daemon=True).start()
+        else:
+            self.root.bell()
 
 
     def undo_move(self):
-        if not self.interaction_enabled or not self.move_history:
-            return
-        disk, from_peg, to_peg = self.move_history.pop()
-        self.pegs[to_peg].pop()
-        self.canvas.itemconfig(disk[0], outline="", width=1)
-        x = self.peg_x[from_peg]
-        y = 340 - len(self.pegs[from_peg]) * 20
-        width = disk[1] * 30
-        self.canvas.coords(disk[0], x - width // 2, y, x + width // 2, y + 20)
-        self.pegs[from_peg].append(disk)
+        if not self.interaction_enabled:
+            return
+        undone = self.state.undo()
+        if not undone:
+            return
+        disk_size, from_peg, to_peg = undone
+        self.place_disk(disk_size, from_peg)
         self.move_count -= 1
         self.update_move_labels()
 
     def check_win(self):
-        if len(self.pegs[2]) == self.num_disks:
+        if self.state.is_solved(self.num_pegs - 1):
             messagebox.showinfo("Congratulations!", f"You solved it in {self.move_count} moves!")
             self.interaction_enabled = True
 
     def reset_game(self):
+        self.solver_stop.set()
         self.interaction_enabled = True
         self.start_game()
 
+    def export_log(self):
+        if not self.interaction_enabled:
+            return
+        path = filedialog.asksaveasfilename(defaultextension=LOG_EXTENSION,
+                                            initialfile=f"hanoi_{self.num_disks}d_{self.num_pegs}p{LOG_EXTENSION}",
+                                            filetypes=[("Hanoi move log", f"*{LOG_EXTENSION}")])
+        if not path:
+            return
+        with open(path, "wb") as f, MoveLogWriter(f, self.num_disks, self.num_pegs) as log:
+            log.extend_history(self.state.history)
+
+    def import_log(self):
+        if not self.interaction_enabled:
+            return
+        path = filedialog.askopenfilename(filetypes=[("Hanoi move log", f"*{LOG_EXTENSION}")])
+        if not path:
+            return
+        try:
+            log = MoveLog.open(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import Log", str(e))
+            return
+        with log:
+            if not (MIN_DISKS <= log.num_disks <= MAX_DISKS and MIN_PEGS <= log.num_pegs <= MAX_PEGS):
+                messagebox.showerror("Import Log", f"Log is for {log.num_disks} disks on {log.num_pegs} pegs, "
+                                                   "which this game does not support.")
+                return
+            # Replayed off-screen with history kept, then drawn once
+            result = replay(log, log.num_disks, log.num_pegs, record=True)
+        if result.illegal_at is not None:
+            messagebox.showerror("Import Log", f"Move {result.illegal_at} in the log is illegal; import cancelled.")
+            return
+        self.new_board(result.state, result.moves)
+
     def start_auto_solver(self):
         if not self.interaction_enabled:
             return
+        try:
+            moves = auto_solve_moves(self.state.to_pegs(), self.num_pegs - 1)
+        except ValueError as e:
+            messagebox.showinfo("Auto Solve", str(e))
+            return
         self.interaction_enabled = False
-        thread = threading.Thread(target=self.solve_hanoi_thread)
-        thread.start()
+        if self.selected_disk is not None:
+            self.canvas.itemconfig(self.disk_items[self.selected_disk], outline="", width=1)
+            self.selected_disk = None
+            self.source_peg = None
 
-    def solve_hanoi_thread(self):
-        time.sleep(0.5)
-        self.solve_hanoi(self.num_disks, 0, 2, 1)
-        self.interaction_enabled = True
+        # Solve from wherever the disks are now. The producer thread only computes
+        # moves; every canvas change happens on the Tk thread in play_frame().
+        self.solver_stop = threading.Event()
+        self.move_queue = queue.Queue(maxsize=MOVE_QUEUE_SIZE)
+        thread = threading.Thread(target=produce_moves, args=(moves, self.move_queue, self.solver_stop), daemon=True)
+        thread.start()
+        self.root.after(500, self.play_frame, self.solver_stop)
 
-    def solve_hanoi(self, n, src, dest, aux):
-        if n == 0:
+    def play_frame(self, stop):
+        # `stop` belongs to the solve that scheduled this frame, so frames left over
+        # from a solve cancelled by Reset die out instead of driving the new game
+        if stop.is_set():
             return
-        self.solve_hanoi(n - 1, src, aux, dest)
-        time.sleep(0.4)
-        self.move_disk(src, dest, record=True)
-        self.move_count += 1
+        turbo = self.turbo_enabled.get()
+        deadline = time.perf_counter() + TURBO_BUDGET
+        while True:
+            try:
+                move = self.move_queue.get_nowait()
+            except queue.Empty:
+                break  # Producer is behind; try again next frame
+            if move is None:
+                self.finish_auto_solve()
+                return
+            self.move_disk(*move, record=True, play_sound=not turbo)
+            self.move_count += 1
+            if not turbo or time.perf_counter() >= deadline:
+                break
+        self.update_move_labels()
+        self.root.after(TURBO_FRAME_MS if turbo else MOVE_FRAME_MS, self.play_frame, stop)
+
+    def finish_auto_solve(self):
         self.update_move_labels()
-        self.root.update()
-        self.solve_hanoi(n - 1, aux, dest, src)
+        self.interaction_enabled = True
+        self.check_win()
+
+
+def produce_moves(moves, move_queue, stop):
+    # Feeds moves then a None sentinel, giving up as soon as `stop` is set
+    for move in itertools.chain(moves, [None]):
+        while True:
+            if stop.is_set():
+                return
+            try:
+                move_queue.put(move, timeout=0.1)
+                break
+            except queue.Full:
+                continue
 
 # Main program launch
 if __name__ == "__main__":
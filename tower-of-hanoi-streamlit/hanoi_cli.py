@@ -0,0 +1,248 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from itertools import islice
+from typing import Iterator, List
+
+from hanoi_engine import (MAX_DISKS, MAX_PEGS, MIN_DISKS, MIN_PEGS, RULES, Move, SolveResult, frame_stewart_count,
+                          multi_peg_moves, replay, run_solve)
+from hanoi_movelog import LOG_EXTENSION, MAGIC, MoveLog, MoveLogWriter
+from hanoi_search import MAX_SEARCH_STATES, shortest_path
+
+
+# =======================
+# Argument helpers
+# =======================
+def parse_range(text: str) -> List[int]:
+    # "3-20", "7" or "3,5,7"
+    values = []
+    for part in text.split(","):
+        low, _, high = part.partition("-")
+        values.extend(range(int(low), int(high or low) + 1))
+    return values
+
+
+def read_text_moves(path: str) -> Iterator[Move]:
+    # One "from to" pair per line; blank lines and # comments are skipped
+    with open(path, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                from_peg, to_peg = line.split()
+                yield int(from_peg), int(to_peg)
+
+
+def parse_positions(text: str, num_disks: int) -> List[int]:
+    # Peg of each disk, smallest disk first: "0120" or "0,1,2,0"; one digit means every disk
+    try:
+        pegs = [int(p) for p in (text.split(",") if "," in text else text)]
+    except ValueError:
+        raise ValueError(f"Bad peg list {text!r}: use digits like 0120 or 0,1,2,0") from None
+    return pegs * num_disks if len(pegs) == 1 else pegs
+
+
+def is_move_log(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+# =======================
+# Commands
+# =======================
+def _solve_job(job) -> SolveResult:
+    disks, pegs, log_dir = job
+    if not log_dir:
+        return run_solve(disks, pegs)
+    # Same run, with every move streamed to a binary log as the solver produces it
+    path = os.path.join(log_dir, f"hanoi_{disks}d_{pegs}p{LOG_EXTENSION}")
+    with open(path, "wb") as f, MoveLogWriter(f, disks, pegs) as log:
+        start = time.perf_counter()
+        result = replay(log.record(multi_peg_moves(disks, pegs)), disks, pegs)
+        elapsed = time.perf_counter() - start
+    return SolveResult(disks, pegs, result.moves, frame_stewart_count(disks, pegs), elapsed,
+                       result.solved and result.illegal_at is None)
+
+
+def cmd_solve(args) -> int:
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+    jobs = [(disks, pegs, args.log_dir) for pegs in args.pegs for disks in args.disks]
+    start = time.perf_counter()
+    if args.workers <= 1:
+        results = [_solve_job(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing only loads when a pool is used
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(_solve_job, jobs))
+    wall = time.perf_counter() - start
+
+    print(f"{'disks':>5} {'pegs':>4} {'moves':>12} {'optimal':>12} {'seconds':>9} {'moves/s':>12}  ok")
+    for r in results:
+        rate = r.moves / r.elapsed if r.elapsed else float("inf")
+        print(f"{r.disks:>5} {r.pegs:>4} {r.moves:>12} {r.optimal:>12} {r.elapsed:>9.3f} {rate:>12.0f}  "
+              f"{'yes' if r.solved else 'NO'}")
+    total = sum(r.moves for r in results)
+    print(f"{len(results)} runs, {total} moves in {wall:.2f}s wall ({total / wall:.0f} moves/s)")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(SolveResult._fields + ("moves_per_second",))
+            for r in results:
+                writer.writerow(tuple(r) + (r.moves / r.elapsed if r.elapsed else "",))
+    return 0 if all(r.solved for r in results) else 1
+
+
+def cmd_replay(args) -> int:
+    log = None
+    if is_move_log(args.file):
+        log = MoveLog.open(args.file)
+        moves, disks, pegs = log, log.num_disks, log.num_pegs
+    elif args.disks is None:
+        print("--disks is required for text move files", file=sys.stderr)
+        return 2
+    else:
+        moves, disks, pegs = read_text_moves(args.file), args.disks, args.pegs
+
+    start = time.perf_counter()
+    result = replay(moves, disks, pegs)
+    elapsed = time.perf_counter() - start
+    print(f"disks: {disks}, pegs: {pegs}")
+    print(f"moves applied: {result.moves} in {elapsed:.3f}s")
+    if result.illegal_at is not None:
+        print(f"first illegal move: #{result.illegal_at}")
+    print(f"solved: {'yes' if result.solved else 'no'} (optimal {frame_stewart_count(disks, pegs)})")
+    if disks <= 20:
+        print(f"final pegs: {result.state.to_pegs()}")
+    if log is not None:
+        log.close()
+    return 0 if result.solved and result.illegal_at is None else 1
+
+
+def cmd_validate(args) -> int:
+    # NumPy is only needed here, so the other commands run without it
+    import numpy as np
+    from hanoi_validate import validate_moves
+
+    log = None
+    if is_move_log(args.file):
+        log = MoveLog.open(args.file)
+        moves, disks, pegs = log, log.num_disks, log.num_pegs
+    elif args.disks is None:
+        print("--disks is required for .npy and text move files", file=sys.stderr)
+        return 2
+    elif args.file.endswith(".npy"):
+        moves, disks, pegs = np.load(args.file, mmap_mode="r"), args.disks, args.pegs
+    else:
+        moves, disks, pegs = read_text_moves(args.file), args.disks, args.pegs
+
+    start = time.perf_counter()
+    result = validate_moves(moves, disks, pegs, rule=RULES[args.rule])
+    elapsed = time.perf_counter() - start
+    if log is not None:
+        log.close()
+    rate = result.moves / elapsed if elapsed else float("inf")
+    print(f"disks: {disks}, pegs: {pegs}, rule: {args.rule}")
+    print(f"legal moves: {result.moves} in {elapsed:.3f}s ({rate:.0f} moves/s)")
+    if result.illegal_at is not None:
+        print(f"first illegal move: #{result.illegal_at}")
+    if result.solved_at is not None:
+        print(f"first solved after {result.solved_at} moves (optimal {frame_stewart_count(disks, pegs)})")
+    print(f"solved at the end: {'yes' if result.solved else 'no'}")
+    if disks <= 20:
+        print(f"final pegs: {result.pegs}")
+    return 0 if result.solved and result.illegal_at is None else 1
+
+
+def cmd_seek(args) -> int:
+    with MoveLog.open(args.file) as log:
+        print(f"disks: {log.num_disks}, pegs: {log.num_pegs}, moves: {len(log)}")
+        try:
+            from_peg, to_peg = log[args.k]
+        except IndexError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(f"move #{args.k}: peg {from_peg} -> peg {to_peg}")
+        if args.board:
+            result = replay(islice(log, args.k), log.num_disks, log.num_pegs)
+            print(f"board before it: {result.state.to_pegs()}")
+    return 0
+
+
+def cmd_search(args) -> int:
+    try:
+        start = parse_positions(args.start, args.disks)
+        goal = parse_positions(args.goal if args.goal is not None else str(args.pegs - 1), args.disks)
+        if len(start) != args.disks or len(goal) != args.disks:
+            raise ValueError(f"--start and --goal need one peg per disk ({args.disks}), or a single peg for all")
+        result = shortest_path(start, goal, args.pegs, RULES[args.rule], args.max_states)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"rule: {args.rule}, disks: {len(start)}, pegs: {args.pegs}")
+    if result.moves is None:
+        print("goal is unreachable")
+    else:
+        print(f"shortest solution: {len(result.moves)} moves")
+        if args.show:
+            for from_peg, to_peg in result.moves:
+                print(from_peg, to_peg)
+    print(f"states explored: {result.explored} in {result.elapsed:.2f}s ({result.states_per_second:.0f} states/s)")
+    return 0 if result.moves is not None else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Headless Tower of Hanoi solve and replay runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="solve full towers and verify every move")
+    solve.add_argument("--disks", type=parse_range, default="3-20", help="disk counts, e.g. 3-20 or 5,10")
+    solve.add_argument("--pegs", type=parse_range, default="3", help="peg counts, e.g. 3-5")
+    solve.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    solve.add_argument("--output", help="write a CSV summary here")
+    solve.add_argument("--log-dir", help=f"record each run's moves as a binary {LOG_EXTENSION} log in this directory")
+    solve.set_defaults(func=cmd_solve)
+
+    replay_cmd = commands.add_parser("replay", help="validate a move sequence from a text file or binary log")
+    replay_cmd.add_argument("file", help=f"a {LOG_EXTENSION} log, or one 'from to' peg pair per line, pegs from 0")
+    replay_cmd.add_argument("--disks", type=int, help="disk count (text files only)")
+    replay_cmd.add_argument("--pegs", type=int, default=3, help="peg count (text files only)")
+    replay_cmd.set_defaults(func=cmd_replay)
+
+    validate = commands.add_parser("validate", help="vectorized legality check of a long move sequence (needs NumPy)")
+    validate.add_argument("file", help=f"a {LOG_EXTENSION} log, an (N, 2) .npy array, or a text move file")
+    validate.add_argument("--disks", type=int, help="disk count (.npy and text files only)")
+    validate.add_argument("--pegs", type=int, default=3, help="peg count (.npy and text files only)")
+    validate.add_argument("--rule", choices=sorted(RULES), default="classic")
+    validate.set_defaults(func=cmd_validate)
+
+    seek = commands.add_parser("seek", help="read move k of a binary log without replaying the rest")
+    seek.add_argument("file")
+    seek.add_argument("k", type=int, help="0-based move index")
+    seek.add_argument("--board", action="store_true", help="also show the board before move k")
+    seek.set_defaults(func=cmd_seek)
+
+    search = commands.add_parser("search", help="bidirectional BFS between any two boards, for any rule set")
+    search.add_argument("--disks", type=int, required=True)
+    search.add_argument("--pegs", type=int, default=3)
+    search.add_argument("--rule", choices=sorted(RULES), default="classic")
+    search.add_argument("--start", default="0", help="peg per disk, smallest first, e.g. 0120 (default: all on 0)")
+    search.add_argument("--goal", help="peg per disk, smallest first (default: all on the last peg)")
+    search.add_argument("--max-states", type=int, default=MAX_SEARCH_STATES, help="refuse state spaces larger than this")
+    search.add_argument("--show", action="store_true", help="print the moves, in replay's text format")
+    search.set_defaults(func=cmd_search)
+
+    args = parser.parse_args(argv)
+    if args.command == "solve":
+        # Frame-Stewart needs 3+ pegs, and a binary log packs each peg into 4 bits
+        if not all(MIN_DISKS <= disks <= MAX_DISKS for disks in args.disks):
+            parser.error(f"--disks must be between {MIN_DISKS} and {MAX_DISKS}")
+        if not all(MIN_PEGS <= pegs <= MAX_PEGS for pegs in args.pegs):
+            parser.error(f"--pegs must be between {MIN_PEGS} and {MAX_PEGS}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
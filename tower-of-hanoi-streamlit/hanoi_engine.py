@@ -0,0 +1,405 @@
+import colorsys
+import time
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+Move = Tuple[int, int]
+Pegs = List[List[int]]
+
+MIN_DISKS = 3
+MAX_DISKS = 30
+MIN_PEGS = 3
+MAX_PEGS = 8
+
+
+# =======================
+# Move generation
+# =======================
+def optimal_move_count(num_disks: int) -> int:
+    return 2 ** num_disks - 1
+
+
+def _peg_labels(num_disks: int, src: int, dest: int, aux: int) -> Tuple[int, int, int]:
+    # The bit formulas below solve towards peg 2 for odd n and peg 1 for even n
+    if num_disks % 2:
+        return src, aux, dest
+    return src, dest, aux
+
+
+def hanoi_moves(num_disks: int, src: int = 0, dest: int = 2, aux: int = 1, start: int = 0) -> Iterator[Move]:
+    # Move k (1-based) moves disk tz(k); its pegs come straight from the bits of k:
+    # from = (k & (k - 1)) % 3, to = ((k | (k - 1)) + 1) % 3 in "odd n" peg order.
+    # No recursion and no move list, so memory stays constant for any disk count.
+    # `start` skips the first moves, resuming a solve that was left after that many.
+    labels = _peg_labels(num_disks, src, dest, aux)
+    for k in range(start + 1, 2 ** num_disks):
+        yield labels[(k & (k - 1)) % 3], labels[((k | (k - 1)) + 1) % 3]
+
+
+def nth_move(num_disks: int, k: int, src: int = 0, dest: int = 2, aux: int = 1) -> Move:
+    # k-th move (1-based) of the optimal solution, without generating the ones before it
+    if not 1 <= k <= optimal_move_count(num_disks):
+        raise ValueError(f"Move number must be between 1 and {optimal_move_count(num_disks)}")
+    labels = _peg_labels(num_disks, src, dest, aux)
+    return labels[(k & (k - 1)) % 3], labels[((k | (k - 1)) + 1) % 3]
+
+
+def state_after(num_disks: int, k: int, src: int = 0, dest: int = 2, aux: int = 1) -> Pegs:
+    # Board after k optimal moves, read off the bits of k from the largest disk down.
+    # Bit d-1 clear: disk d hasn't left its source yet and disks below d are heading
+    # to the spare peg. Bit set: disk d is on its target and the rest follow it there.
+    if not 0 <= k <= optimal_move_count(num_disks):
+        raise ValueError(f"Move number must be between 0 and {optimal_move_count(num_disks)}")
+    pegs = [[], [], []]
+    for disk in range(num_disks, 0, -1):
+        half = 1 << (disk - 1)
+        if k < half:
+            pegs[src].append(disk)
+            dest, aux = aux, dest
+        else:
+            pegs[dest].append(disk)
+            k -= half
+            src, aux = aux, src
+    return pegs
+
+
+def solve_from(pegs: Pegs, target: int = 2) -> Iterator[Move]:
+    # Shortest solution from any legal position to a full tower on `target`.
+    # Walk down from the largest disk: a disk already on its goal peg stays put,
+    # otherwise every smaller disk must first gather on the third peg. That gives a
+    # chain of (disk, from, to, spare) steps, emitted smallest-first, each one being
+    # a single move followed by a classic tower transfer. The position is read
+    # eagerly, so the caller may start moving disks as soon as this returns.
+    position = _positions_from_pegs(pegs)
+    num_disks = len(position) - 1
+
+    steps = []
+    goal = target
+    for disk in range(num_disks, 0, -1):
+        if position[disk] != goal:
+            spare = 3 - position[disk] - goal
+            steps.append((disk, position[disk], goal, spare))
+            goal = spare
+    return _play_steps(reversed(steps))
+
+
+def _positions_from_pegs(pegs: Pegs) -> List[int]:
+    # Peg of every disk (index 0 unused), checking the layout is a legal position
+    num_disks = sum(len(disks) for disks in pegs)
+    position = [-1] * (num_disks + 1)
+    for peg, disks in enumerate(pegs):
+        for below, above in zip(disks, disks[1:]):
+            if above > below:
+                raise ValueError(f"Illegal position: disk {above} sits on smaller disk {below}")
+        for disk in disks:
+            if not 1 <= disk <= num_disks or position[disk] != -1:
+                raise ValueError("Illegal position: disks must be numbered 1..n")
+            position[disk] = peg
+    return position
+
+
+def _play_steps(steps) -> Iterator[Move]:
+    for disk, from_peg, to_peg, spare in steps:
+        yield from_peg, to_peg
+        yield from hanoi_moves(disk - 1, spare, to_peg, from_peg)
+
+
+# =======================
+# Multi-peg (Frame-Stewart)
+# =======================
+@lru_cache(maxsize=32)
+def _frame_stewart_table(num_disks: int, num_pegs: int) -> Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]:
+    # Bottom-up DP over disk and peg counts. For k pegs and n disks the best plan
+    # parks the top n-t disks on a spare (k pegs), moves the other t with k-1
+    # pegs, then brings the parked ones back: M(n, k) = min_t 2M(n-t, k) + M(t, k-1).
+    # Row k-3 holds (move counts, best t) for n = 0..num_disks.
+    counts = tuple(2 ** n - 1 for n in range(num_disks + 1))
+    rows = [(counts, tuple(range(num_disks + 1)))]
+    for _ in range(4, num_pegs + 1):
+        fewer = rows[-1][0]
+        counts, splits = [0], [0]
+        for n in range(1, num_disks + 1):
+            best, split = min((2 * counts[n - t] + fewer[t], t) for t in range(1, n + 1))
+            counts.append(best)
+            splits.append(split)
+        rows.append((tuple(counts), tuple(splits)))
+    return tuple(rows)
+
+
+def frame_stewart_count(num_disks: int, num_pegs: int = 3) -> int:
+    # Presumed-optimal move count for a full tower on num_pegs pegs (optimal for 3 and 4)
+    return _frame_stewart_table(num_disks, num_pegs)[num_pegs - 3][0][num_disks]
+
+
+def multi_peg_moves(num_disks: int, num_pegs: int = 3, src: int = 0, dest: Optional[int] = None) -> Iterator[Move]:
+    # Frame-Stewart solution moving a full tower from src to dest, streamed lazily
+    if dest is None:
+        dest = num_pegs - 1
+    table = _frame_stewart_table(num_disks, num_pegs)
+    spares = tuple(peg for peg in range(num_pegs) if peg not in (src, dest))
+    return _frame_stewart_moves(table, num_disks, src, dest, spares)
+
+
+def _frame_stewart_moves(table, n: int, src: int, dest: int, spares: Sequence[int]) -> Iterator[Move]:
+    if n == 0:
+        return
+    if len(spares) == 1:
+        yield from hanoi_moves(n, src, dest, spares[0])
+        return
+    split = table[len(spares) - 1][1][n]
+    park, others = spares[0], spares[1:]
+    yield from _frame_stewart_moves(table, n - split, src, park, (dest,) + tuple(others))
+    yield from _frame_stewart_moves(table, split, src, dest, others)
+    yield from _frame_stewart_moves(table, n - split, park, dest, (src,) + tuple(others))
+
+
+def auto_solve_moves(pegs: Pegs, target: int) -> Iterator[Move]:
+    # What the front-ends' Auto Solve plays: the optimal 3-peg solution from any
+    # position, or Frame-Stewart for more pegs when all disks form one tower
+    if len(pegs) == 3:
+        return solve_from(pegs, target)
+    num_disks = sum(len(disks) for disks in pegs)
+    for peg, disks in enumerate(pegs):
+        if len(disks) == num_disks:
+            if peg == target:
+                return iter(())
+            return multi_peg_moves(num_disks, len(pegs), peg, target)
+    raise ValueError("Auto Solve with more than 3 pegs needs all disks stacked on one peg")
+
+
+def move_disk_number(k: int) -> int:
+    # Disk moved on move k (1 = smallest) is one plus the number of trailing zero bits
+    return (k & -k).bit_length()
+
+
+# =======================
+# Rule sets
+# =======================
+# A rule says which peg-to-peg moves exist at all; the smaller-on-larger rule
+# always applies on top of it. HanoiState and the shortest-path search share them.
+Rule = Callable[[int, int, int], bool]
+
+
+def classic_rule(from_peg: int, to_peg: int, num_pegs: int) -> bool:
+    return True
+
+
+def cyclic_rule(from_peg: int, to_peg: int, num_pegs: int) -> bool:
+    # Disks only travel clockwise: 0 -> 1 -> ... -> last -> 0
+    return to_peg == (from_peg + 1) % num_pegs
+
+
+def adjacent_rule(from_peg: int, to_peg: int, num_pegs: int) -> bool:
+    # No jumping over a peg
+    return abs(from_peg - to_peg) == 1
+
+
+RULES: Dict[str, Rule] = {
+    "classic": classic_rule,
+    "cyclic": cyclic_rule,
+    "adjacent": adjacent_rule,
+}
+
+
+def allowed_moves(rule: Rule, num_pegs: int) -> Tuple[Move, ...]:
+    return tuple((f, t) for f in range(num_pegs) for t in range(num_pegs) if f != t and rule(f, t, num_pegs))
+
+
+# =======================
+# Board state
+# =======================
+class HanoiState:
+    # Compact board: one byte per disk for its peg, one int bitmask per peg (bit d-1
+    # set when disk d is on it) so the top disk and move legality are O(1), and
+    # the move history packed as one (from << 4 | to) byte per move. `allowed`
+    # holds the peg pairs a variant rule permits (None for the classic game).
+    __slots__ = ("num_disks", "positions", "masks", "history", "allowed")
+
+    def __init__(self, num_disks: int, num_pegs: int = 3, start: int = 0, rule: Rule = classic_rule):
+        self.num_disks = num_disks
+        self.positions = array("B", [start]) * (num_disks + 1)
+        self.masks = [0] * num_pegs
+        self.masks[start] = (1 << num_disks) - 1
+        self.history = bytearray()
+        self.allowed = None if rule is classic_rule else frozenset(allowed_moves(rule, num_pegs))
+
+    @classmethod
+    def from_pegs(cls, pegs: Pegs, rule: Rule = classic_rule) -> "HanoiState":
+        position = _positions_from_pegs(pegs)
+        state = cls(len(position) - 1, len(pegs), rule=rule)
+        state.masks = [0] * len(pegs)
+        for disk in range(1, len(position)):
+            state.positions[disk] = position[disk]
+            state.masks[position[disk]] |= 1 << (disk - 1)
+        return state
+
+    @property
+    def num_pegs(self) -> int:
+        return len(self.masks)
+
+    @property
+    def full_mask(self) -> int:
+        return (1 << self.num_disks) - 1
+
+    def top(self, peg: int) -> int:
+        # Smallest disk on the peg, 0 when it is empty
+        mask = self.masks[peg]
+        return (mask & -mask).bit_length()
+
+    def height(self, peg: int) -> int:
+        return bin(self.masks[peg]).count("1")
+
+    def peg_disks(self, peg: int) -> List[int]:
+        # Disks on the peg, bottom first, as in the old list-of-lists pegs
+        mask = self.masks[peg]
+        return [disk for disk in range(self.num_disks, 0, -1) if mask >> (disk - 1) & 1]
+
+    def to_pegs(self) -> Pegs:
+        return [self.peg_disks(peg) for peg in range(self.num_pegs)]
+
+    def can_move(self, from_peg: int, to_peg: int) -> bool:
+        disk = self.top(from_peg)
+        if not disk or from_peg == to_peg:
+            return False
+        if self.allowed is not None and (from_peg, to_peg) not in self.allowed:
+            return False
+        target_top = self.top(to_peg)
+        return not target_top or disk < target_top
+
+    def move(self, from_peg: int, to_peg: int, record: bool = True) -> int:
+        if not self.can_move(from_peg, to_peg):
+            raise ValueError(f"Illegal move from peg {from_peg} to peg {to_peg}")
+        disk = self.top(from_peg)
+        bit = 1 << (disk - 1)
+        self.masks[from_peg] ^= bit
+        self.masks[to_peg] |= bit
+        self.positions[disk] = to_peg
+        if record:
+            self.history.append(from_peg << 4 | to_peg)
+        return disk
+
+    def undo(self) -> Optional[Tuple[int, int, int]]:
+        # Reverts the last recorded move and returns (disk, from_peg, to_peg)
+        if not self.history:
+            return None
+        packed = self.history.pop()
+        from_peg, to_peg = packed >> 4, packed & 0xF
+        disk = self.top(to_peg)
+        bit = 1 << (disk - 1)
+        self.masks[to_peg] ^= bit
+        self.masks[from_peg] |= bit
+        self.positions[disk] = from_peg
+        return disk, from_peg, to_peg
+
+    def is_solved(self, target: int = 2) -> bool:
+        return self.masks[target] == self.full_mask
+
+
+# =======================
+# Simulation
+# =======================
+class ReplayResult(NamedTuple):
+    state: HanoiState
+    moves: int                    # legal moves applied
+    illegal_at: Optional[int]     # 0-based index of the first illegal move, if any
+    solved: bool
+
+
+class SolveResult(NamedTuple):
+    disks: int
+    pegs: int
+    moves: int
+    optimal: int
+    elapsed: float
+    solved: bool
+
+
+def replay(moves: Iterable[Move], num_disks: int, num_pegs: int = 3, target: Optional[int] = None,
+           state: Optional[HanoiState] = None, record: bool = False) -> ReplayResult:
+    # Applies moves to a fresh tower on peg 0 (or the given state), stopping at the
+    # first illegal one. Peg numbers outside the board count as illegal too.
+    # record=True keeps the moves in the state's history, e.g. so they can be undone.
+    if state is None:
+        state = HanoiState(num_disks, num_pegs)
+    if target is None:
+        target = state.num_pegs - 1
+    applied = 0
+    for from_peg, to_peg in moves:
+        if not (0 <= from_peg < state.num_pegs and 0 <= to_peg < state.num_pegs
+                and state.can_move(from_peg, to_peg)):
+            return ReplayResult(state, applied, applied, state.is_solved(target))
+        state.move(from_peg, to_peg, record=record)
+        applied += 1
+    return ReplayResult(state, applied, None, state.is_solved(target))
+
+
+def run_solve(num_disks: int, num_pegs: int = 3) -> SolveResult:
+    # Solves a full tower and checks every move through the state's legality rules
+    start = time.perf_counter()
+    result = replay(multi_peg_moves(num_disks, num_pegs), num_disks, num_pegs)
+    elapsed = time.perf_counter() - start
+    return SolveResult(num_disks, num_pegs, result.moves, frame_stewart_count(num_disks, num_pegs), elapsed,
+                       result.solved and result.illegal_at is None)
+
+
+# =======================
+# Display helpers
+# =======================
+@lru_cache(maxsize=None)
+def disk_colors(num_disks: int) -> Tuple[str, ...]:
+    # Rainbow from red (smallest disk) to violet (largest), for any disk count
+    colors = []
+    for i in range(num_disks):
+        hue = 0.8 * i / max(num_disks - 1, 1)
+        r, g, b = colorsys.hsv_to_rgb(hue, 0.85, 0.95)
+        colors.append(f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}")
+    return tuple(colors)
+
+
+def disk_width(disk: int, num_disks: int, min_width: int, max_width: int) -> int:
+    # Widths spread evenly between the smallest and largest disk
+    if num_disks <= 1:
+        return max_width
+    return min_width + (max_width - min_width) * (disk - 1) // (num_disks - 1)
+
+
+def disk_height(num_disks: int, stack_height: int, max_height: int = 20, min_height: int = 2) -> int:
+    # Tallest disk that still lets a full tower fit in `stack_height`
+    return max(min_height, min(max_height, stack_height // max(num_disks, 1)))
+
+
+# =======================
+# Animation
+# =======================
+async def animate_moves(moves: Iterable[Move], apply_move: Callable[[int, int], None], delay: float,
+                        should_stop: Callable[[], bool] = lambda: False) -> int:
+    # Plays one move per frame without blocking the event loop, so a single server
+    # process can animate many sessions. Returns how many moves were applied.
+    import asyncio  # only the async apps get here; the CLI and tkinter start without it
+    applied = 0
+    for from_peg, to_peg in moves:
+        await asyncio.sleep(delay)
+        if should_stop():
+            break
+        apply_move(from_peg, to_peg)
+        applied += 1
+    return applied
+
+
+# =======================
+# Throughput check
+# =======================
+def measure_throughput(num_disks: int) -> float:
+    start = time.perf_counter()
+    count = 0
+    for _ in hanoi_moves(num_disks):
+        count += 1
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else float("inf")
+
+
+if __name__ == "__main__":
+    for n in (10, 15, 20, 22):
+        rate = measure_throughput(n)
+        print(f"{n:>2} disks: {optimal_move_count(n):>9} moves, {rate / 1e6:6.2f}M moves/s")
@@ -0,0 +1,259 @@
+import io
+import mmap
+import struct
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+from hanoi_engine import HanoiState, Move
+
+# =======================
+# Format
+# =======================
+# An 8-byte header (magic, version, disk count, peg count, bits per move)
+# followed by the moves. Each move is stored as its index among the ordered
+# (from, to) peg pairs: a nibble when there are at most 4 pegs (12 pairs, two
+# moves per byte, first move in the high nibble) and a byte otherwise. Move k
+# therefore sits at a fixed offset, so seeking is O(1) on a memory map. An odd
+# nibble count is padded with 0xF, which is never a valid pair, so the count
+# always follows from the file size and a writer can simply keep appending.
+MAGIC = b"HANO"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBB")
+PROGRESS = struct.Struct("<QQB")  # move count, jump prefix, disk count
+PAD = 0xF
+FLUSH_BYTES = 1 << 16
+LOG_EXTENSION = ".hlog"
+
+
+def bits_per_move(num_pegs: int) -> int:
+    return 4 if num_pegs * (num_pegs - 1) < PAD else 8
+
+
+@lru_cache(maxsize=None)
+def _pairs(num_pegs: int) -> Tuple[Move, ...]:
+    return tuple((f, t) for f in range(num_pegs) for t in range(num_pegs) if f != t)
+
+
+@lru_cache(maxsize=None)
+def _codes(num_pegs: int) -> bytes:
+    # Translation table from a HanoiState history byte (from << 4 | to) to a pair
+    # code; 0xFF marks bytes that are not a move between two distinct pegs
+    table = bytearray([0xFF]) * 256
+    for code, (f, t) in enumerate(_pairs(num_pegs)):
+        table[f << 4 | t] = code
+    return bytes(table)
+
+
+@lru_cache(maxsize=None)
+def _decode_table(num_pegs: int, bits: int) -> Tuple[Tuple[Move, ...], ...]:
+    # Moves held by each possible byte. Codes outside the pair list decode to
+    # (-1, -1), which replay() reports as an illegal move.
+    pairs = _pairs(num_pegs)
+
+    def decode(code):
+        return pairs[code] if code < len(pairs) else (-1, -1)
+
+    if bits == 8:
+        return tuple((decode(b),) for b in range(256))
+    return tuple((decode(b >> 4),) if b & 0xF == PAD else (decode(b >> 4), decode(b & 0xF)) for b in range(256))
+
+
+# =======================
+# Writer
+# =======================
+class MoveLogWriter:
+    # Streams moves into an open binary file as they are made, buffering up to
+    # FLUSH_BYTES. close() (or leaving the with block) writes any pending half
+    # byte; the file itself stays open for the caller.
+    def __init__(self, f: BinaryIO, num_disks: int, num_pegs: int = 3):
+        self.f = f
+        self.num_pegs = num_pegs
+        self.bits = bits_per_move(num_pegs)
+        self.codes = _codes(num_pegs)
+        self.buffer = bytearray()
+        self.pending = None
+        self.count = 0
+        f.write(HEADER.pack(MAGIC, VERSION, num_disks, num_pegs, self.bits))
+
+    def append(self, from_peg: int, to_peg: int):
+        self.extend_history(bytes((from_peg << 4 | to_peg,)))
+
+    def extend(self, moves: Iterable[Move]):
+        for _ in self.record(moves):
+            pass
+
+    def record(self, moves: Iterable[Move]) -> Iterator[Move]:
+        # Passes the moves through while logging them, so a solver or replay can
+        # be recorded as it runs without materialising the sequence
+        chunk = bytearray()
+        for move in moves:
+            chunk.append(move[0] << 4 | move[1])
+            if len(chunk) >= FLUSH_BYTES:
+                self.extend_history(chunk)
+                chunk.clear()
+            yield move
+        self.extend_history(chunk)
+
+    def extend_history(self, history: bytes):
+        # Bulk path for HanoiState.history, which already holds one packed byte per move
+        codes = bytes(history).translate(self.codes)
+        if 0xFF in codes:
+            bad = codes.index(0xFF)
+            raise ValueError(f"Move {self.count + bad} is not between two of the {self.num_pegs} pegs")
+        self.count += len(codes)
+        if self.bits == 8:
+            self.buffer += codes
+        else:
+            if self.pending is not None:
+                codes = bytes((self.pending,)) + codes
+                self.pending = None
+            if len(codes) % 2:
+                self.pending = codes[-1]
+                codes = codes[:-1]
+            self.buffer += bytes(high << 4 | low for high, low in zip(codes[0::2], codes[1::2]))
+        if len(self.buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        self.f.write(self.buffer)
+        self.buffer.clear()
+        self.f.flush()
+
+    def close(self):
+        if self.pending is not None:
+            self.buffer.append(self.pending << 4 | PAD)
+            self.pending = None
+        self.flush()
+
+    def __enter__(self) -> "MoveLogWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def dump_moves(moves: Iterable[Move], num_disks: int, num_pegs: int = 3) -> bytes:
+    f = io.BytesIO()
+    with MoveLogWriter(f, num_disks, num_pegs) as log:
+        log.extend(moves)
+    return f.getvalue()
+
+
+def dump_history(history: bytes, num_disks: int, num_pegs: int = 3, prefix: Iterable[Move] = ()) -> bytes:
+    # History bytes of a HanoiState, optionally after moves it did not record
+    # (e.g. the optimal moves skipped over by a jump)
+    f = io.BytesIO()
+    with MoveLogWriter(f, num_disks, num_pegs) as log:
+        log.extend(prefix)
+        log.extend_history(history)
+    return f.getvalue()
+
+
+# =======================
+# Reader
+# =======================
+class MoveLog:
+    # Read-only view over a log held in bytes or a memory map. Iteration decodes
+    # a chunk of bytes at a time and log[k] reads just the byte holding move k.
+    def __init__(self, data, owner: Optional[mmap.mmap] = None):
+        if len(data) < HEADER.size:
+            raise ValueError("Not a move log: file too short")
+        magic, version, self.num_disks, self.num_pegs, self.bits = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a move log: bad magic")
+        if version != VERSION:
+            raise ValueError(f"Unsupported move log version {version}")
+        if self.bits != bits_per_move(self.num_pegs):
+            raise ValueError("Corrupt move log: bits per move does not match the peg count")
+        self.data = memoryview(data)[HEADER.size:]
+        self.owner = owner
+        self.table = _decode_table(self.num_pegs, self.bits)
+        self.count = len(self.data)
+        if self.bits == 4:
+            self.count *= 2
+            if self.count and self.data[-1] & 0xF == PAD:
+                self.count -= 1
+
+    @classmethod
+    def open(cls, path: str) -> "MoveLog":
+        # Memory-mapped, so even a 2^30 move log costs no RAM up front
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, mapped)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, k: int) -> Move:
+        if not 0 <= k < self.count:
+            raise IndexError(f"Move {k} is outside the log (0-{self.count - 1})")
+        if self.bits == 8:
+            code = self.data[k]
+        else:
+            byte = self.data[k >> 1]
+            code = byte & 0xF if k % 2 else byte >> 4
+        pairs = _pairs(self.num_pegs)
+        return pairs[code] if code < len(pairs) else (-1, -1)
+
+    def __iter__(self) -> Iterator[Move]:
+        return self.moves()
+
+    def moves(self, start: int = 0) -> Iterator[Move]:
+        table = self.table
+        per_byte = 8 // self.bits
+        first = start // per_byte
+        skip = start - first * per_byte
+        for offset in range(first, len(self.data), FLUSH_BYTES):
+            chunk = bytes(self.data[offset:offset + FLUSH_BYTES])
+            if skip:
+                yield from islice(table[chunk[0]], skip, None)
+                chunk = chunk[1:]
+                skip = 0
+            for byte in chunk:
+                yield from table[byte]
+
+    def close(self):
+        self.data.release()
+        if self.owner is not None:
+            self.owner.close()
+
+    def __enter__(self) -> "MoveLog":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =======================
+# Saved games
+# =======================
+class GameProgress:
+    # What an app needs to resume a game: the board with its undo history and the
+    # move counters. The record is the counters, one byte per disk for its peg,
+    # then the history as a move log, so a game costs about half a byte per move.
+    __slots__ = ("state", "move_count", "log_prefix")
+
+    def __init__(self, state: HanoiState, move_count: int = 0, log_prefix: int = 0):
+        self.state = state
+        self.move_count = move_count
+        self.log_prefix = log_prefix  # optimal moves skipped by a jump, not in state.history
+
+    def to_record(self) -> bytes:
+        state = self.state
+        return (PROGRESS.pack(self.move_count, self.log_prefix, state.num_disks) + bytes(state.positions[1:])
+                + dump_history(state.history, state.num_disks, state.num_pegs))
+
+    @classmethod
+    def from_record(cls, data: bytes) -> "GameProgress":
+        move_count, log_prefix, num_disks = PROGRESS.unpack_from(data)
+        start = PROGRESS.size
+        positions = data[start:start + num_disks]
+        log = MoveLog(data[start + num_disks:])
+        state = HanoiState(num_disks, log.num_pegs)
+        state.masks = [0] * log.num_pegs
+        for disk, peg in enumerate(positions, 1):
+            state.positions[disk] = peg
+            state.masks[peg] |= 1 << (disk - 1)
+        state.history = bytearray(from_peg << 4 | to_peg for from_peg, to_peg in log)
+        return cls(state, move_count, log_prefix)
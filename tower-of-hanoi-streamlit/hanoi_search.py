@@ -0,0 +1,167 @@
+import time
+from array import array
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from hanoi_engine import MAX_PEGS, MIN_PEGS, Move, Pegs, Rule, _positions_from_pegs, allowed_moves, classic_rule
+
+# =======================
+# Packed state space
+# =======================
+# A board is one integer: disk d (1-based) on peg p contributes p * k**(d-1).
+# Every state of n disks on k pegs is then an index below k**n, so the whole
+# search keeps one byte per state in a flat bytearray: 0 = unseen, otherwise
+# which side reached it and through which move, which doubles as the parent
+# pointer for rebuilding the path. Memory is fixed at k**n bytes up front.
+MAX_SEARCH_STATES = 1 << 26  # 64 MiB of marks
+
+FORWARD = 1         # forward marks are FORWARD + move code
+BACKWARD = 65       # backward marks are BACKWARD + move code
+FORWARD_ROOT = 63
+BACKWARD_ROOT = 127
+
+
+class SearchResult(NamedTuple):
+    moves: Optional[List[Move]]  # None when the goal cannot be reached
+    explored: int
+    elapsed: float
+
+    @property
+    def states_per_second(self) -> float:
+        return self.explored / self.elapsed if self.elapsed else float("inf")
+
+
+def encode_state(positions: Sequence[int], num_pegs: int) -> int:
+    # positions[i] is the peg of disk i + 1
+    state = 0
+    for peg in reversed(positions):
+        state = state * num_pegs + peg
+    return state
+
+
+def decode_state(state: int, num_disks: int, num_pegs: int) -> List[int]:
+    positions = []
+    for _ in range(num_disks):
+        state, peg = divmod(state, num_pegs)
+        positions.append(peg)
+    return positions
+
+
+def positions_from_pegs(pegs: Pegs) -> List[int]:
+    return _positions_from_pegs(pegs)[1:]
+
+
+def _top(state: int, peg: int, num_pegs: int) -> int:
+    # Smallest disk on the peg; the caller knows the peg is not empty
+    disk = 1
+    while state % num_pegs != peg:
+        state //= num_pegs
+        disk += 1
+    return disk
+
+
+# =======================
+# Bidirectional BFS
+# =======================
+def shortest_path(start: Sequence[int], goal: Sequence[int], num_pegs: int = 3, rule: Rule = classic_rule,
+                  max_states: int = MAX_SEARCH_STATES) -> SearchResult:
+    # Fewest moves from start to goal (peg per disk, smallest disk first) under
+    # the rule. Searches forward from start and backward from goal a whole level
+    # at a time, always growing the smaller frontier, and stops when they touch.
+    num_disks = len(start)
+    if len(goal) != num_disks:
+        raise ValueError("Start and goal must have the same number of disks")
+    if not MIN_PEGS <= num_pegs <= MAX_PEGS:  # move codes must stay below the root marks
+        raise ValueError(f"Peg count must be between {MIN_PEGS} and {MAX_PEGS}")
+    if any(not 0 <= peg < num_pegs for peg in (*start, *goal)):
+        raise ValueError(f"Pegs must be numbered 0 to {num_pegs - 1}")
+    if num_pegs ** num_disks > max_states:
+        raise ValueError(f"{num_pegs}**{num_disks} states is over the search limit of {max_states}")
+    moves = allowed_moves(rule, num_pegs)
+    powers = [num_pegs ** d for d in range(num_disks)]
+    source = encode_state(start, num_pegs)
+    target = encode_state(goal, num_pegs)
+
+    started = time.perf_counter()
+    if source == target:
+        return SearchResult([], 1, time.perf_counter() - started)
+    marks = bytearray(num_pegs ** num_disks)
+    marks[source] = FORWARD_ROOT
+    marks[target] = BACKWARD_ROOT
+    forward, backward = array("q", [source]), array("q", [target])
+    explored = 2
+
+    while forward and backward:
+        grow_forward = len(forward) <= len(backward)
+        frontier, meeting = _expand(forward if grow_forward else backward, grow_forward, marks, moves,
+                                    powers, num_disks, num_pegs)
+        explored += len(frontier)
+        if meeting is not None:
+            path = _path(meeting, grow_forward, marks, moves, powers, num_pegs)
+            return SearchResult(path, explored, time.perf_counter() - started)
+        if grow_forward:
+            forward = frontier
+        else:
+            backward = frontier
+    return SearchResult(None, explored, time.perf_counter() - started)
+
+
+def _expand(frontier, forward: bool, marks: bytearray, moves: Sequence[Move], powers: List[int],
+            num_disks: int, num_pegs: int) -> Tuple[array, Optional[Tuple[int, int, int]]]:
+    # One BFS level. Forward steps apply a move; backward steps find the states
+    # a move leads *from*, so one-way rules such as cyclic stay correct.
+    # Returns the next level, or the (state, neighbour, move code) where the sides met.
+    base = FORWARD if forward else BACKWARD
+    next_frontier = array("q")
+    append = next_frontier.append
+    tops = [0] * num_pegs
+    for state in frontier:
+        # Top disk of every peg, reading the smallest disks first until all pegs are seen
+        for peg in range(num_pegs):
+            tops[peg] = 0
+        rest, found = state, 0
+        for disk in range(1, num_disks + 1):
+            rest, peg = divmod(rest, num_pegs)
+            if not tops[peg]:
+                tops[peg] = disk
+                found += 1
+                if found == num_pegs:
+                    break
+        for code, (from_peg, to_peg) in enumerate(moves):
+            if forward:
+                disk, other = tops[from_peg], tops[to_peg]
+                shift = to_peg - from_peg
+            else:
+                disk, other = tops[to_peg], tops[from_peg]
+                shift = from_peg - to_peg
+            if not disk or (other and other < disk):
+                continue
+            neighbour = state + shift * powers[disk - 1]
+            mark = marks[neighbour]
+            if not mark:
+                marks[neighbour] = base + code
+                append(neighbour)
+            elif (mark < BACKWARD) != forward:
+                return next_frontier, (state, neighbour, code)
+    return next_frontier, None
+
+
+def _path(meeting: Tuple[int, int, int], forward: bool, marks: bytearray, moves: Sequence[Move],
+          powers: List[int], num_pegs: int) -> List[Move]:
+    state, neighbour, code = meeting
+    # Orient the bridging move so it goes from the start side to the goal side
+    near, far = (state, neighbour) if forward else (neighbour, state)
+
+    head = []
+    while marks[near] != FORWARD_ROOT:
+        from_peg, to_peg = moves[marks[near] - FORWARD]
+        head.append((from_peg, to_peg))
+        near += (from_peg - to_peg) * powers[_top(near, to_peg, num_pegs) - 1]
+    head.reverse()
+
+    tail = []
+    while marks[far] != BACKWARD_ROOT:
+        from_peg, to_peg = moves[marks[far] - BACKWARD]
+        tail.append((from_peg, to_peg))
+        far += (to_peg - from_peg) * powers[_top(far, from_peg, num_pegs) - 1]
+
+    return head + [moves[code]] + tail
@@ -0,0 +1,185 @@
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from hanoi_engine import Move, Pegs, Rule, _positions_from_pegs, allowed_moves, classic_rule
+from hanoi_movelog import MoveLog, _pairs
+
+CHUNK = 1 << 14  # moves per vectorized pass; small enough for the gathers to stay in cache
+DECODE_BLOCK = 1 << 20  # moves decoded from a log at once
+
+
+class ValidationResult(NamedTuple):
+    moves: int                  # legal moves applied
+    illegal_at: Optional[int]   # 0-based index of the first illegal move, if any
+    solved: bool                # final board has every disk on the target peg
+    solved_at: Optional[int]    # moves applied when the board was first solved
+    pegs: Pegs                  # final board, bottom disk first
+
+
+# =======================
+# Chunk check
+# =======================
+# Each peg is a stack: a move pops its from peg and pushes its to peg. A pop
+# at stack level L takes the disk of the latest earlier push at level L on the
+# same peg (or the disk that started there), so sorting pushes and pops by
+# (peg, level, time) finds which move's disk each pop carries.
+# Pointer jumping then resolves each move's disk, and the size rule is the
+# same lookup one level lower. Everything up to the first illegal move only
+# depends on earlier moves, so results are exact up to that index.
+def _check_chunk(f: np.ndarray, t: np.ndarray, positions: np.ndarray, num_pegs: int, target: int,
+                 allowed: np.ndarray) -> Tuple[int, Optional[int], np.ndarray]:
+    # Returns (legal moves, move count at first solve or None, positions after the legal prefix)
+    num_disks = len(positions) - 1
+    m = len(f)
+    bad = (f < 0) | (f >= num_pegs) | (t < 0) | (t >= num_pegs) | (f == t)
+    in_range = ~bad
+    bad[in_range] |= ~allowed[f[in_range], t[in_range]]
+    if bad.any():
+        m = int(np.argmax(bad))
+        f, t = f[:m], t[:m]
+    if m == 0:
+        return 0, None, positions
+
+    # Starting stacks, bottom (largest) disk first, padded with 0
+    stacks = np.zeros((num_pegs, num_disks + 1), dtype=np.int64)
+    heights = np.zeros(num_pegs, dtype=np.int64)
+    for disk in range(num_disks, 0, -1):
+        peg = positions[disk]
+        stacks[peg, heights[peg]] = disk
+        heights[peg] += 1
+
+    # Stack depth after every pop (even event) and push (odd event), per peg
+    pegs = np.empty(2 * m, dtype=np.int64)
+    pegs[0::2], pegs[1::2] = f, t
+    signs = np.empty(2 * m, dtype=np.int64)
+    signs[0::2], signs[1::2] = -1, 1
+    depth = np.empty(2 * m, dtype=np.int64)
+    for peg in range(num_pegs):
+        on_peg = pegs == peg
+        depth[on_peg] = np.cumsum(signs[on_peg]) + heights[peg]
+    pop_level = depth[0::2] + 1
+    push_level = depth[1::2]
+
+    # One sort over pushes plus two lookups per move: the disk its pop takes
+    # (same peg and level) and the disk its push lands on (one level lower).
+    # Keys are (peg, level, time, kind); after sorting, the latest push at or
+    # before each lookup is a running maximum of push positions.
+    moves = np.arange(m)
+    span, shift = num_disks + 2 * m + 2, m + 1
+    groups = np.concatenate((t * span + push_level, f * span + pop_level, t * span + push_level - 1)) + shift
+    times = np.concatenate((2 * moves + 1, 2 * moves, 2 * moves + 1))
+    keys = (groups * (2 * m) + times) * 2 + np.repeat([1, 0, 0], m)
+    order = np.argsort(keys)
+    latest = np.maximum.accumulate(np.where(order < m, np.arange(3 * m), -1))
+    found = np.empty(3 * m, dtype=np.int64)
+    found[order] = latest
+    safe = np.maximum(found, 0)
+    found = np.where((found >= 0) & (keys[order[safe]] // (4 * m) == groups), order[safe], -1)
+    source, below_source = found[m:2 * m], found[2 * m:]
+
+    def start_disk(peg, level):
+        # Disk that started at this stack level, 0 if none
+        index = np.clip(level - 1, 0, num_disks)
+        return np.where((level >= 1) & (level <= heights[peg]), stacks[peg, index], 0)
+
+    disk = np.where(source < 0, start_disk(f, pop_level), 0)
+    pointer = np.where(source < 0, moves, source)
+    for _ in range(m.bit_length()):
+        disk = np.where(disk == 0, disk[pointer], disk)
+        pointer = pointer[pointer]
+
+    below = np.where(below_source >= 0, disk[np.maximum(below_source, 0)], start_disk(t, push_level - 1))
+    illegal = (pop_level < 1) | (disk == 0) | ((below != 0) & (below < disk))
+    if illegal.any():
+        m = int(np.argmax(illegal))
+
+    disk, t = disk[:m], t[:m]
+    last = np.full(num_disks + 1, -1, dtype=np.int64)
+    np.maximum.at(last, disk, np.arange(m))
+    moved = last >= 0
+    positions = positions.copy()
+    positions[moved] = t[last[moved]]
+
+    solved = np.flatnonzero((t == target) & (push_level[:m] == num_disks))
+    return m, int(solved[0]) + 1 if len(solved) else None, positions
+
+
+# =======================
+# Input chunks
+# =======================
+def _log_chunks(log: MoveLog, chunk: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # Decodes the packed log straight into arrays, a few chunks per pass; codes
+    # that are not a peg pair become (-1, -1) and fail the range check
+    pairs = list(_pairs(log.num_pegs))
+    pairs += [(-1, -1)] * ((1 << log.bits) - len(pairs))
+    from_table = np.array([f for f, _ in pairs], dtype=np.int64)
+    to_table = np.array([t for _, t in pairs], dtype=np.int64)
+    data = np.frombuffer(log.data, dtype=np.uint8)
+    per_byte = 8 // log.bits
+    step = max(chunk, DECODE_BLOCK) // per_byte
+    for start in range(0, len(data), step):
+        raw = data[start:start + step]
+        if log.bits == 4:
+            codes = np.empty(2 * len(raw), dtype=np.uint8)
+            codes[0::2], codes[1::2] = raw >> 4, raw & 0xF
+            codes = codes[:len(log) - start * 2]
+        else:
+            codes = raw
+        f, t = from_table[codes], to_table[codes]
+        for offset in range(0, len(codes), chunk):
+            yield f[offset:offset + chunk], t[offset:offset + chunk]
+
+
+def _chunks(moves, chunk: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    if isinstance(moves, MoveLog):
+        yield from _log_chunks(moves, chunk)
+    elif isinstance(moves, np.ndarray):
+        moves = moves.reshape(-1, 2)
+        for start in range(0, len(moves), chunk):
+            block = moves[start:start + chunk].astype(np.int64)
+            yield block[:, 0].copy(), block[:, 1].copy()
+    else:
+        iterator = iter(moves)
+        while True:
+            block = np.array(list(islice(iterator, chunk)), dtype=np.int64).reshape(-1, 2)
+            if not len(block):
+                return
+            yield block[:, 0], block[:, 1]
+
+
+# =======================
+# Public API
+# =======================
+def validate_moves(moves: Union[np.ndarray, MoveLog, Iterable[Move]], num_disks: int, num_pegs: int = 3,
+                   target: Optional[int] = None, start: Optional[Pegs] = None, rule: Rule = classic_rule,
+                   chunk: int = CHUNK) -> ValidationResult:
+    # Checks a whole move sequence (an (N, 2) array, a MoveLog or any iterable of
+    # pairs) from `start` (default: full tower on peg 0) without a HanoiState
+    if start is None:
+        positions = np.zeros(num_disks + 1, dtype=np.int64)
+    else:
+        positions = np.array(_positions_from_pegs(start), dtype=np.int64)
+        positions[0] = 0
+        num_disks, num_pegs = len(positions) - 1, len(start)
+    if target is None:
+        target = num_pegs - 1
+    allowed = np.zeros((num_pegs, num_pegs), dtype=bool)
+    for from_peg, to_peg in allowed_moves(rule, num_pegs):
+        allowed[from_peg, to_peg] = True
+
+    applied = 0
+    illegal_at = None
+    solved_at = 0 if (positions[1:] == target).all() else None
+    for f, t in _chunks(moves, chunk):
+        legal, solved, positions = _check_chunk(f, t, positions, num_pegs, target, allowed)
+        if solved_at is None and solved is not None:
+            solved_at = applied + solved
+        applied += legal
+        if legal < len(f):
+            illegal_at = applied
+            break
+
+    pegs = [[disk for disk in range(num_disks, 0, -1) if positions[disk] == peg] for peg in range(num_pegs)]
+    return ValidationResult(applied, illegal_at, bool((positions[1:] == target).all()), solved_at, pegs)
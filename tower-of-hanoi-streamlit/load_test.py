@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from hanoi_engine import HanoiState, animate_moves, solve_from
+
+
+# Simulates N concurrent auto-solve sessions on one event loop, the way the
+# coroutine-based pywebio server runs them, and measures how late each frame
+# lands against its scheduled time plus the memory each session holds.
+async def run_session(num_disks, delay, lateness):
+    state = HanoiState(num_disks)
+    expected = time.perf_counter() + delay
+
+    def apply_move(from_peg, to_peg):
+        nonlocal expected
+        now = time.perf_counter()
+        lateness.append(now - expected)
+        expected = now + delay
+        state.move(from_peg, to_peg)
+        state.to_pegs()  # stand-in for building the two peg views a frame re-renders
+
+    await animate_moves(solve_from(state.to_pegs(), 2), apply_move, delay)
+    return state
+
+
+async def run_load(sessions, num_disks, delay):
+    lateness = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    states = await asyncio.gather(*(run_session(num_disks, delay, lateness) for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert all(state.is_solved(2) for state in states)
+    return lateness, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent auto-solve load test")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--disks", type=int, default=7)
+    parser.add_argument("--delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    lateness, elapsed, peak = asyncio.run(run_load(args.sessions, args.disks, args.delay))
+    lateness.sort()
+    ms = [value * 1000 for value in lateness]
+    print(f"sessions: {args.sessions}, disks: {args.disks}, delay: {args.delay * 1000:.0f} ms")
+    print(f"frames: {len(ms)} in {elapsed:.2f}s ({len(ms) / elapsed:.0f} frames/s)")
+    print(f"frame lateness ms: median {statistics.median(ms):.2f}, "
+          f"p95 {ms[int(len(ms) * 0.95)]:.2f}, max {ms[-1]:.2f}")
+    print(f"peak memory per session: {peak / args.sessions / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
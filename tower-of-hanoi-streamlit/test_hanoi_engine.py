@@ -0,0 +1,151 @@
+import itertools
+import random
+from collections import deque
+
+import pytest
+
+from hanoi_engine import (RULES, HanoiState, auto_solve_moves, cyclic_rule, frame_stewart_count, hanoi_moves,
+                          move_disk_number, multi_peg_moves, nth_move, optimal_move_count, replay, solve_from,
+                          state_after)
+
+
+def recursive_moves(n, src, dest, aux):
+    # Textbook recursion, the reference for the bit formulas
+    if n:
+        yield from recursive_moves(n - 1, src, aux, dest)
+        yield src, dest
+        yield from recursive_moves(n - 1, aux, dest, src)
+
+
+def pegs_of(positions, num_pegs):
+    # positions[d - 1] is the peg of disk d
+    return [[d for d in range(len(positions), 0, -1) if positions[d - 1] == peg] for peg in range(num_pegs)]
+
+
+def bfs_distances(num_disks, num_pegs, target):
+    # Moves from every board to a full tower on target, by plain BFS outwards from
+    # that tower (classic moves are reversible, so the graph is undirected)
+    goal = (target,) * num_disks
+    seen = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        positions = queue.popleft()
+        state = HanoiState.from_pegs(pegs_of(positions, num_pegs))
+        for from_peg in range(num_pegs):
+            for to_peg in range(num_pegs):
+                if state.can_move(from_peg, to_peg):
+                    nxt = list(positions)
+                    nxt[state.top(from_peg) - 1] = to_peg
+                    nxt = tuple(nxt)
+                    if nxt not in seen:
+                        seen[nxt] = seen[positions] + 1
+                        queue.append(nxt)
+    return seen
+
+
+def play(pegs, moves):
+    state = HanoiState.from_pegs(pegs)
+    for from_peg, to_peg in moves:
+        state.move(from_peg, to_peg)  # raises on an illegal move
+    return state
+
+
+@pytest.mark.parametrize("num_disks", range(0, 9))
+def test_bit_formulas_match_recursion(num_disks):
+    for src, dest, aux in itertools.permutations(range(3)):
+        expected = list(recursive_moves(num_disks, src, dest, aux))
+        assert list(hanoi_moves(num_disks, src, dest, aux)) == expected
+        assert len(expected) == optimal_move_count(num_disks)
+        for k in range(1, len(expected) + 1):
+            assert nth_move(num_disks, k, src, dest, aux) == expected[k - 1]
+            assert list(hanoi_moves(num_disks, src, dest, aux, start=k)) == expected[k:]
+
+
+@pytest.mark.parametrize("num_disks", [1, 2, 5, 8])
+def test_state_after_matches_replay(num_disks):
+    state = HanoiState(num_disks)
+    assert state_after(num_disks, 0) == state.to_pegs()
+    for k, (from_peg, to_peg) in enumerate(hanoi_moves(num_disks), 1):
+        assert move_disk_number(k) == state.move(from_peg, to_peg)
+        assert state_after(num_disks, k) == state.to_pegs()
+    with pytest.raises(ValueError):
+        state_after(num_disks, optimal_move_count(num_disks) + 1)
+    with pytest.raises(ValueError):
+        nth_move(num_disks, 0)
+
+
+def test_state_after_other_pegs():
+    moves = list(hanoi_moves(6, 1, 0, 2))
+    assert state_after(6, 20, 1, 0, 2) == replay(moves[:20], 6, state=HanoiState(6, start=1)).state.to_pegs()
+
+
+@pytest.mark.parametrize("num_disks", range(1, 6))
+def test_solve_from_is_optimal_on_every_board(num_disks):
+    for target in range(3):
+        distances = bfs_distances(num_disks, 3, target)
+        assert len(distances) == 3 ** num_disks
+        for positions, distance in distances.items():
+            pegs = pegs_of(positions, 3)
+            moves = list(solve_from(pegs, target))
+            assert len(moves) == distance
+            assert play(pegs, moves).is_solved(target)
+
+
+def test_frame_stewart_counts():
+    assert [frame_stewart_count(n, 3) for n in range(8)] == [optimal_move_count(n) for n in range(8)]
+    assert [frame_stewart_count(n, 4) for n in range(1, 11)] == [1, 3, 5, 9, 13, 17, 25, 33, 41, 49]
+    assert [frame_stewart_count(n, 5) for n in range(1, 8)] == [1, 3, 5, 7, 11, 15, 19]
+    # Proven optimal for 4 pegs: check small towers against BFS
+    for num_disks in range(1, 6):
+        assert bfs_distances(num_disks, 4, 3)[(0,) * num_disks] == frame_stewart_count(num_disks, 4)
+
+
+@pytest.mark.parametrize("num_pegs", range(3, 9))
+def test_multi_peg_moves_solve(num_pegs):
+    for num_disks in (1, 4, 9):
+        for src, dest in ((0, num_pegs - 1), (num_pegs - 1, 1)):
+            moves = list(multi_peg_moves(num_disks, num_pegs, src, dest))
+            assert len(moves) == frame_stewart_count(num_disks, num_pegs)
+            result = replay(moves, num_disks, num_pegs, dest, HanoiState(num_disks, num_pegs, start=src))
+            assert result.illegal_at is None and result.solved
+
+
+def test_auto_solve_moves():
+    assert list(auto_solve_moves([[], [3, 2, 1], [], []], 1)) == []
+    moves = list(auto_solve_moves([[], [], [3, 2, 1], []], 0))
+    assert len(moves) == frame_stewart_count(3, 4)
+    assert play([[], [], [3, 2, 1], []], moves).is_solved(0)
+    with pytest.raises(ValueError):
+        auto_solve_moves([[2], [1], [], []], 3)
+
+
+def test_state_moves_and_undo():
+    rng = random.Random(3)
+    for num_pegs in range(3, 9):
+        state = HanoiState(6, num_pegs)
+        boards = [state.to_pegs()]
+        for _ in range(200):
+            legal = [(f, t) for f in range(num_pegs) for t in range(num_pegs) if state.can_move(f, t)]
+            state.move(*rng.choice(legal))
+            boards.append(state.to_pegs())
+        assert HanoiState.from_pegs(boards[-1]).masks == state.masks
+        assert all(state.positions[d] == p for p, disks in enumerate(boards[-1]) for d in disks)
+        while boards:
+            assert state.to_pegs() == boards.pop()
+            state.undo()
+        assert state.undo() is None
+
+
+def test_state_rejects_illegal():
+    state = HanoiState(3)
+    state.move(0, 2)
+    assert not state.can_move(0, 2) and not state.can_move(1, 0) and not state.can_move(2, 2)
+    with pytest.raises(ValueError):
+        state.move(0, 2)
+    cyclic = HanoiState(3, rule=cyclic_rule)
+    assert cyclic.can_move(0, 1) and not cyclic.can_move(0, 2)
+    assert RULES["adjacent"](1, 2, 3) and not RULES["adjacent"](0, 2, 3)
+    with pytest.raises(ValueError):
+        HanoiState.from_pegs([[1, 2], [], []])
+    with pytest.raises(ValueError):
+        HanoiState.from_pegs([[3, 1], [1], []])
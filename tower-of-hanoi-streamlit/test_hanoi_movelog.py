@@ -0,0 +1,81 @@
+import io
+import random
+
+import pytest
+
+from hanoi_engine import HanoiState, hanoi_moves, multi_peg_moves, replay
+from hanoi_movelog import HEADER, MoveLog, MoveLogWriter, dump_history, dump_moves
+
+
+def random_moves(num_pegs, count, seed):
+    # Any peg pairs, legal or not: the log stores moves, it does not judge them
+    rng = random.Random(seed)
+    return [tuple(rng.sample(range(num_pegs), 2)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("num_pegs", [3, 4, 5, 8])
+@pytest.mark.parametrize("count", [0, 1, 2, 7, 1000])
+def test_round_trip(num_pegs, count):
+    moves = random_moves(num_pegs, count, seed=num_pegs * 1000 + count)
+    log = MoveLog(dump_moves(moves, 6, num_pegs))
+    assert (log.num_disks, log.num_pegs, len(log)) == (6, num_pegs, count)
+    assert list(log) == moves
+
+
+@pytest.mark.parametrize("num_pegs", [3, 5])
+def test_seek_matches_iteration(num_pegs):
+    moves = random_moves(num_pegs, 257, seed=num_pegs)
+    log = MoveLog(dump_moves(moves, 4, num_pegs))
+    assert [log[k] for k in range(len(log))] == moves
+    for start in (0, 1, 2, 128, 255, 256, 257):
+        assert list(log.moves(start)) == moves[start:]
+    with pytest.raises(IndexError):
+        log[len(log)]
+
+
+def test_packing_size():
+    # Two moves per byte up to 4 pegs, one byte per move above
+    assert len(dump_moves(random_moves(4, 11, 0), 3, 4)) == HEADER.size + 6
+    assert len(dump_moves(random_moves(5, 11, 0), 3, 5)) == HEADER.size + 11
+
+
+def test_streaming_writer_matches_dump():
+    moves = list(hanoi_moves(10))
+    f = io.BytesIO()
+    with MoveLogWriter(f, 10) as writer:
+        for from_peg, to_peg in moves[:100]:
+            writer.append(from_peg, to_peg)
+        passed = list(writer.record(moves[100:500]))
+        writer.extend(moves[500:])
+    assert passed == moves[100:500]
+    assert f.getvalue() == dump_moves(moves, 10)
+
+
+def test_history_with_prefix_replays():
+    state = HanoiState(5, 4)
+    for from_peg, to_peg in multi_peg_moves(5, 4):
+        state.move(from_peg, to_peg)
+    prefix = [(0, 1), (1, 0)]
+    log = MoveLog(dump_history(state.history, 5, 4, prefix))
+    assert list(log)[:2] == prefix
+    result = replay(log, log.num_disks, log.num_pegs)
+    assert result.illegal_at is None and result.solved
+
+
+def test_open_memory_maps(tmp_path):
+    moves = list(hanoi_moves(8))
+    path = tmp_path / "game.hlog"
+    path.write_bytes(dump_moves(moves, 8))
+    with MoveLog.open(str(path)) as log:
+        assert len(log) == len(moves)
+        assert log[len(moves) - 1] == moves[-1]
+
+
+def test_rejects_bad_headers():
+    data = dump_moves([(0, 2)], 3)
+    with pytest.raises(ValueError):
+        MoveLog(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        MoveLog(data[:4])
+    with pytest.raises(ValueError):
+        MoveLogWriter(io.BytesIO(), 3).extend_history(bytes((3 << 4 | 0,)))
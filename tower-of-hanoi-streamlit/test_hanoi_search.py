@@ -0,0 +1,89 @@
+import random
+from collections import deque
+
+import pytest
+
+from hanoi_engine import RULES, HanoiState, frame_stewart_count, optimal_move_count
+from hanoi_search import decode_state, encode_state, positions_from_pegs, shortest_path
+
+
+def bfs_distance(start, goal, num_pegs, rule):
+    # Plain one-sided BFS over explicit boards, the reference for shortest_path
+    def board(positions):
+        return HanoiState.from_pegs([[d for d in range(len(positions), 0, -1) if positions[d - 1] == peg]
+                                     for peg in range(num_pegs)], rule=rule)
+
+    seen = {tuple(start): 0}
+    queue = deque([tuple(start)])
+    while queue:
+        positions = queue.popleft()
+        if positions == tuple(goal):
+            return seen[positions]
+        state = board(positions)
+        for from_peg in range(num_pegs):
+            for to_peg in range(num_pegs):
+                if state.can_move(from_peg, to_peg):
+                    nxt = list(positions)
+                    nxt[state.top(from_peg) - 1] = to_peg
+                    nxt = tuple(nxt)
+                    if nxt not in seen:
+                        seen[nxt] = seen[positions] + 1
+                        queue.append(nxt)
+    return None
+
+
+def apply_path(start, moves, num_pegs, rule):
+    pegs = [[d for d in range(len(start), 0, -1) if start[d - 1] == peg] for peg in range(num_pegs)]
+    state = HanoiState.from_pegs(pegs, rule=rule)
+    for from_peg, to_peg in moves:
+        state.move(from_peg, to_peg)  # raises on an illegal move
+    return positions_from_pegs(state.to_pegs())
+
+
+def test_encoding_round_trip():
+    rng = random.Random(0)
+    for _ in range(200):
+        num_pegs = rng.randint(3, 6)
+        positions = [rng.randrange(num_pegs) for _ in range(rng.randint(1, 8))]
+        assert decode_state(encode_state(positions, num_pegs), len(positions), num_pegs) == positions
+
+
+@pytest.mark.parametrize("num_disks,num_pegs", [(3, 3), (6, 3), (4, 4), (6, 4), (5, 5)])
+def test_full_tower_is_optimal(num_disks, num_pegs):
+    start, goal = [0] * num_disks, [num_pegs - 1] * num_disks
+    result = shortest_path(start, goal, num_pegs)
+    expected = optimal_move_count(num_disks) if num_pegs == 3 else frame_stewart_count(num_disks, num_pegs)
+    assert len(result.moves) == expected
+    assert apply_path(start, result.moves, num_pegs, RULES["classic"]) == goal
+
+
+@pytest.mark.parametrize("rule_name", sorted(RULES))
+def test_matches_plain_bfs(rule_name):
+    # Random start and goal boards: same length as plain BFS, and the path is legal
+    rule = RULES[rule_name]
+    rng = random.Random(rule_name)
+    for _ in range(60):
+        num_pegs = rng.randint(3, 4)
+        num_disks = rng.randint(1, 5)
+        start = [rng.randrange(num_pegs) for _ in range(num_disks)]
+        goal = [rng.randrange(num_pegs) for _ in range(num_disks)]
+        result = shortest_path(start, goal, num_pegs, rule)
+        distance = bfs_distance(start, goal, num_pegs, rule)
+        if distance is None:
+            assert result.moves is None
+        else:
+            assert len(result.moves) == distance
+            assert apply_path(start, result.moves, num_pegs, rule) == goal
+
+
+def test_state_limit():
+    with pytest.raises(ValueError):
+        shortest_path([0] * 10, [2] * 10, 3, max_states=1000)
+
+
+@pytest.mark.parametrize("start,goal,num_pegs", [([3, 0], [2, 2], 3), ([0, 0], [0, -1], 3), ([0], [0, 1], 3),
+                                                 ([0], [1], 2), ([0], [1], 9)])
+def test_rejects_bad_boards(start, goal, num_pegs):
+    # An out-of-range peg would spill into the next disk's base-k digit
+    with pytest.raises(ValueError):
+        shortest_path(start, goal, num_pegs)
@@ -0,0 +1,96 @@
+import random
+
+import numpy as np
+import pytest
+
+from hanoi_engine import RULES, HanoiState, classic_rule, hanoi_moves, multi_peg_moves, replay
+from hanoi_movelog import MoveLog, dump_moves
+from hanoi_validate import validate_moves
+
+
+def reference(moves, num_disks, num_pegs, target, start, rule):
+    # Move-by-move replay on a HanoiState, tracking the first solve
+    state = HanoiState.from_pegs(start, rule=rule) if start else HanoiState(num_disks, num_pegs, rule=rule)
+    solved_at = 0 if state.is_solved(target) else None
+    result = None
+    for applied, (from_peg, to_peg) in enumerate(moves):
+        result = replay([(from_peg, to_peg)], num_disks, num_pegs, target, state)
+        if result.illegal_at is not None:
+            return applied, applied, solved_at, state.to_pegs()
+        if solved_at is None and state.is_solved(target):
+            solved_at = applied + 1
+    return len(moves), None, solved_at, state.to_pegs()
+
+
+def random_game(rng, num_disks, num_pegs, length, rule, start=None, legal_bias=0.97):
+    # Mostly legal moves with an occasional random (often illegal) one
+    state = HanoiState.from_pegs(start, rule=rule) if start else HanoiState(num_disks, num_pegs, rule=rule)
+    moves = []
+    for _ in range(length):
+        legal = [(f, t) for f in range(num_pegs) for t in range(num_pegs) if state.can_move(f, t)]
+        if legal and rng.random() < legal_bias:
+            move = rng.choice(legal)
+            state.move(*move)
+        else:
+            move = (rng.randrange(-1, num_pegs + 1), rng.randrange(-1, num_pegs + 1))
+        moves.append(move)
+    return moves
+
+
+def random_start(rng, num_disks, num_pegs):
+    pegs = [[] for _ in range(num_pegs)]
+    for disk in range(num_disks, 0, -1):
+        pegs[rng.randrange(num_pegs)].append(disk)
+    return pegs
+
+
+def check(moves, num_disks, num_pegs=3, target=None, start=None, rule=classic_rule, chunk=64):
+    if start:
+        num_disks, num_pegs = sum(map(len, start)), len(start)
+    expected_target = num_pegs - 1 if target is None else target
+    applied, illegal_at, solved_at, pegs = reference(moves, num_disks, num_pegs, expected_target, start, rule)
+    result = validate_moves(moves, num_disks, num_pegs, target, start, rule, chunk=chunk)
+    assert (result.moves, result.illegal_at, result.solved_at, result.pegs) == (applied, illegal_at, solved_at, pegs)
+    assert result.solved == (pegs[expected_target] == list(range(num_disks, 0, -1)))
+
+
+def test_matches_replay_on_random_sequences():
+    # Small chunks so sequences cross several chunk boundaries
+    rng = random.Random(20)
+    for case in range(300):
+        num_pegs = rng.randint(3, 6)
+        num_disks = rng.randint(1, 7)
+        rule = RULES[rng.choice(sorted(RULES))]
+        start = random_start(rng, num_disks, num_pegs) if case % 2 else None
+        moves = random_game(rng, num_disks, num_pegs, rng.randint(0, 400), rule, start)
+        check(moves, num_disks, num_pegs, start=start, rule=rule, chunk=rng.choice([1, 7, 64, 1 << 14]))
+
+
+@pytest.mark.parametrize("num_disks,num_pegs", [(6, 3), (5, 4), (7, 5)])
+def test_full_solutions(num_disks, num_pegs):
+    moves = list(multi_peg_moves(num_disks, num_pegs))
+    result = validate_moves(moves, num_disks, num_pegs, chunk=50)
+    assert result.solved and result.illegal_at is None and result.solved_at == len(moves)
+
+
+def test_custom_start_on_more_pegs_uses_its_last_peg():
+    # The default target follows the start board's peg count, not num_pegs
+    moves = list(multi_peg_moves(4, 4))
+    result = validate_moves(moves, 4, start=[[4, 3, 2, 1], [], [], []])
+    assert result.solved and result.solved_at == len(moves)
+    check(moves, 4, start=[[4, 3, 2, 1], [], [], []])
+
+
+def test_already_solved_start():
+    result = validate_moves([], 3, start=[[], [], [3, 2, 1]])
+    assert result.solved and result.solved_at == 0
+
+
+def test_input_forms_agree():
+    moves = list(hanoi_moves(9))
+    moves[300] = (moves[300][1], moves[300][0])
+    from_list = validate_moves(moves, 9, chunk=100)
+    from_array = validate_moves(np.array(moves), 9, chunk=100)
+    from_log = validate_moves(MoveLog(dump_moves(moves, 9)), 9, chunk=100)
+    assert from_list == from_array == from_log
+    assert from_list.illegal_at == reference(moves, 9, 3, 2, None, classic_rule)[1]
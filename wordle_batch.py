@@ -0,0 +1,128 @@
+import argparse
+import collections
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from wordle_engine import MAX_WORD_LENGTH, MIN_WORD_LENGTH, WordIndex, WordleGame, WordleSolver, load_word_index
+
+Strategy = Callable[[WordleGame], Optional[str]]
+
+
+# =======================
+# Strategies
+# =======================
+def entropy_strategy(game: WordleGame) -> Optional[str]:
+    return game.hint()
+
+
+def candidate_strategy(game: WordleGame) -> Optional[str]:
+    # Random word still consistent with the feedback: a cheap baseline
+    if game.solver is None:
+        game.solver = WordleSolver(game.word_index)
+    game.solver.sync(game.attempts)
+    candidates = game.solver.candidates
+    if not len(candidates):
+        return None
+    return game.word_index[int(game.solver.rng.choice(candidates))]
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "entropy": entropy_strategy,
+    "candidate": candidate_strategy,
+}
+
+
+def resolve_strategy(name: str) -> Strategy:
+    # Built-in name, or "module:function" for a strategy defined elsewhere
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module_name, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(f"Unknown strategy {name!r}; use one of {sorted(STRATEGIES)} or module:function")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def play_game(index: WordIndex, target: str, strategy: Strategy, seed: int) -> int:
+    # Guesses needed to win, or 0 for a loss
+    game = WordleGame(index, target)
+    game.solver = WordleSolver(index, seed)
+    while game.status == "IN_PROGRESS":
+        guess = strategy(game)
+        if guess is None or guess not in index:
+            break
+        game.guess(guess)
+    return len(game.attempts) if game.status == "WON" else 0
+
+
+# =======================
+# Worker pool
+# =======================
+_index = None
+_strategy = None
+_seed = 0
+
+
+def _init_worker(words_path: str, word_length: int, strategy_name: str, seed: int):
+    # Each worker loads the dictionary once, not once per game
+    global _index, _strategy, _seed
+    _index = load_word_index(words_path, word_length)
+    _strategy = resolve_strategy(strategy_name)
+    _seed = seed
+
+
+def _play_chunk(targets: range) -> List[int]:
+    return [play_game(_index, _index[i], _strategy, _seed + i) for i in targets]
+
+
+def evaluate(words_path: str, strategy_name: str, workers: int, chunk_size: int,
+             limit: Optional[int] = None, seed: int = 0, word_length: int = 5) -> List[int]:
+    index = load_word_index(words_path, word_length)
+    total = len(index) if limit is None else min(limit, len(index))
+    chunks = [range(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    if workers <= 1:
+        _init_worker(words_path, word_length, strategy_name, seed)
+        return [result for chunk in chunks for result in _play_chunk(chunk)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(words_path, word_length, strategy_name, seed)) as pool:
+        return [result for chunk_results in pool.map(_play_chunk, chunks) for result in chunk_results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play every dictionary word as a target, headlessly")
+    parser.add_argument("--words", default="words.txt", help="word list, one word per line")
+    parser.add_argument("--word-length", type=int, default=5,
+                        help=f"{MIN_WORD_LENGTH}-{MAX_WORD_LENGTH}; ignored for a compiled .widx")
+    parser.add_argument("--strategy", default="entropy", help=f"{' | '.join(STRATEGIES)} | module:function")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64, help="targets per work item")
+    parser.add_argument("--limit", type=int, help="only play the first N targets")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not MIN_WORD_LENGTH <= args.word_length <= MAX_WORD_LENGTH:
+        parser.error(f"--word-length must be between {MIN_WORD_LENGTH} and {MAX_WORD_LENGTH}")
+
+    random.seed(args.seed)
+    start = time.perf_counter()
+    results = evaluate(args.words, args.strategy, args.workers, args.chunk_size, args.limit, args.seed,
+                       args.word_length)
+    elapsed = time.perf_counter() - start
+
+    print(f"strategy: {args.strategy}, games: {len(results)}, workers: {args.workers}")
+    if not results:
+        print("no games played: the word list is empty or --limit is 0")
+        return
+    wins = [guesses for guesses in results if guesses]
+    distribution = collections.Counter(results)
+    print(f"win rate: {len(wins) / len(results):.2%}, mean guesses (wins): "
+          f"{sum(wins) / len(wins) if wins else float('nan'):.3f}")
+    for guesses in range(1, max(distribution, default=0) + 1):
+        print(f"  {guesses}: {distribution.get(guesses, 0)}")
+    print(f"  X: {distribution.get(0, 0)}")
+    print(f"{len(results) / elapsed:.1f} games/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
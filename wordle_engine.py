@@ -0,0 +1,579 @@
+import mmap
+import os
+import random
+import struct
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import metrics
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# NumPy is imported inside the functions that need it: loading a dictionary and
+# playing guesses never touch it, so an app's first render does not pay for it.
+
+GRAY, YELLOW, GREEN = 0, 1, 2
+COLOR_NAMES = ("gray", "yellow", "green")
+
+# Hint search bounds: entropy is scored for at most GUESS_POOL guesses against at
+# most ANSWER_SAMPLE candidates, keeping each hint fast with huge dictionaries
+GUESS_POOL = 500
+ANSWER_SAMPLE = 1000
+
+# Hint scoring counts 3**word_length feedback buckets per pooled guess, which is
+# ~50 MB at 8 letters and grows 3x per letter after that
+MIN_WORD_LENGTH = 2
+MAX_WORD_LENGTH = 8
+
+
+# =======================
+# Word Index
+# =======================
+class WordIndex:
+    # Immutable dictionary shared by every session: the sorted words packed into
+    # one fixed-width blob so a random target is a slice rather than an entry in
+    # a list of str objects. Built from words it also keeps a frozenset for O(1)
+    # validation; over a compiled file (from_packed) validation is a binary search
+    # of the blob, so loading creates no per-word objects at all.
+    __slots__ = ("words", "packed", "word_length")
+
+    def __init__(self, words: Iterable[str], word_length: int = 5):
+        ordered = sorted(set(words))
+        self.words = frozenset(ordered)
+        self.packed = "".join(ordered).encode("ascii")
+        self.word_length = word_length
+
+    @classmethod
+    def from_packed(cls, packed, word_length: int = 5) -> "WordIndex":
+        # packed: sorted, distinct, lowercase words back to back (bytes or an mmap)
+        index = cls.__new__(cls)
+        index.words = None
+        index.packed = packed
+        index.word_length = word_length
+        return index
+
+    def __len__(self) -> int:
+        return len(self.packed) // self.word_length
+
+    def __contains__(self, word: str) -> bool:
+        if self.words is not None:
+            return word in self.words
+        return self.position(word) >= 0
+
+    def __getitem__(self, i: int) -> str:
+        start = i * self.word_length
+        return self.packed[start:start + self.word_length].decode("ascii")
+
+    def random_word(self) -> str:
+        return self[random.randrange(len(self))]
+
+    def position(self, word: str) -> int:
+        # Index of a word in the sorted packing, -1 if absent; compares raw bytes
+        length = self.word_length
+        if len(word) != length or not word.isascii():
+            return -1
+        key = word.encode("ascii")
+        packed = self.packed
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if packed[mid * length:(mid + 1) * length] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and packed[lo * length:(lo + 1) * length] == key else -1
+
+    def encoded(self) -> "np.ndarray":
+        # (N, word_length) uint8 view of the packed words, no copy
+        import numpy as np
+        return np.frombuffer(self.packed, dtype=np.uint8, count=len(self) * self.word_length).reshape(
+            -1, self.word_length)
+
+
+def check_word_length(word_length: int):
+    if not MIN_WORD_LENGTH <= word_length <= MAX_WORD_LENGTH:
+        raise ValueError(f"Word length must be between {MIN_WORD_LENGTH} and {MAX_WORD_LENGTH}, got {word_length}")
+
+
+def read_word_index(path: str, word_length: int = 5) -> WordIndex:
+    # Plain word list, one word per line; anything not word_length ASCII letters is skipped
+    check_word_length(word_length)
+    with open(path, "r") as f:
+        words = f.read().lower().split()
+    return WordIndex((word for word in words if len(word) == word_length and word.isascii() and word.isalpha()),
+                     word_length)
+
+
+# =======================
+# Compiled dictionaries
+# =======================
+# A word list is compiled once into "<name>.<length>.widx": a header (magic,
+# version, word length, count, data offset, and the source's size and mtime)
+# padded to the mmap granularity, then the sorted words back to back. Later
+# starts check the header against the source and map the words straight in,
+# so start-up no longer parses, sorts or allocates per word.
+DICT_MAGIC = b"WIDX"
+DICT_VERSION = 1
+DICT_HEADER = struct.Struct("<4sBBxxIIqq")
+DICT_EXTENSION = ".widx"
+
+
+def compiled_path(source: str, word_length: int = 5) -> str:
+    return f"{os.path.splitext(source)[0]}.{word_length}{DICT_EXTENSION}"
+
+
+def _source_stamp(source: str) -> Tuple[int, int]:
+    info = os.stat(source)
+    return info.st_size, info.st_mtime_ns
+
+
+def compile_word_index(source: str, word_length: int = 5, path: Optional[str] = None) -> str:
+    path = path or compiled_path(source, word_length)
+    index = read_word_index(source, word_length)
+    offset = mmap.ALLOCATIONGRANULARITY
+    header = DICT_HEADER.pack(DICT_MAGIC, DICT_VERSION, word_length, len(index), offset, *_source_stamp(source))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(offset, b"\0"))
+        f.write(index.packed)
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_compiled(path: str, source: Optional[str] = None) -> Optional[WordIndex]:
+    # Maps a compiled dictionary; None when it is missing, from another version
+    # or platform, or older than its source
+    try:
+        with open(path, "rb") as f:
+            header = f.read(DICT_HEADER.size)
+            if len(header) < DICT_HEADER.size:
+                return None
+            magic, version, word_length, count, offset, size, mtime = DICT_HEADER.unpack(header)
+            if magic != DICT_MAGIC or version != DICT_VERSION or offset % mmap.ALLOCATIONGRANULARITY:
+                return None
+            if source is not None and _source_stamp(source) != (size, mtime):
+                return None
+            if count == 0:
+                return WordIndex.from_packed(b"", word_length)
+            packed = mmap.mmap(f.fileno(), count * word_length, access=mmap.ACCESS_READ, offset=offset)
+    except (OSError, ValueError):
+        return None
+    return WordIndex.from_packed(packed, word_length)
+
+
+def load_word_index(source: str, word_length: int = 5) -> WordIndex:
+    # What the apps call: maps the compiled dictionary, compiling it first when
+    # it is missing or stale. A .widx path is opened directly. If the compiled
+    # file cannot be written (read-only directory) the text is parsed as before.
+    if source.endswith(DICT_EXTENSION):
+        index = open_compiled(source)
+        if index is None:
+            raise ValueError(f"{source} is not a compiled dictionary")
+        check_word_length(index.word_length)
+        return index
+    check_word_length(word_length)
+    path = compiled_path(source, word_length)
+    index = open_compiled(path, source)
+    if index is not None and index.word_length == word_length:
+        return index
+    try:
+        compile_word_index(source, word_length, path)
+    except OSError:
+        return read_word_index(source, word_length)
+    return open_compiled(path, source) or read_word_index(source, word_length)
+
+
+def encode_words(words: Sequence[str]) -> "np.ndarray":
+    import numpy as np
+    length = len(words[0]) if words else 5
+    return np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(-1, length)
+
+
+# =======================
+# Feedback patterns
+# =======================
+# A pattern packs one colour per letter as a base-3 number, letter i weighted
+# 3**i, so a 5-letter pattern fits 0..242 and a whole matrix is uint8.
+def feedback_pattern(guess: str, target: str) -> int:
+    length = len(guess)
+    colors = [GRAY] * length
+    remaining = list(target)
+
+    # First pass - green
+    for i in range(length):
+        if guess[i] == target[i]:
+            colors[i] = GREEN
+            remaining[i] = None
+
+    # Second pass - yellow, each target letter used at most once
+    for i in range(length):
+        if colors[i] == GRAY and guess[i] in remaining:
+            colors[i] = YELLOW
+            remaining[remaining.index(guess[i])] = None
+
+    return sum(color * 3 ** i for i, color in enumerate(colors))
+
+
+def decode_pattern(pattern: int, length: int = 5) -> List[str]:
+    names = []
+    for _ in range(length):
+        pattern, color = divmod(pattern, 3)
+        names.append(COLOR_NAMES[color])
+    return names
+
+
+def encode_pattern(colors: Sequence[str]) -> int:
+    return sum(COLOR_NAMES.index(color) * 3 ** i for i, color in enumerate(colors))
+
+
+def pattern_matrix(guesses: "np.ndarray", answers: "np.ndarray", chunk: int = 512) -> "np.ndarray":
+    # Patterns for every guess x answer pair, computed in guess chunks to bound
+    # memory. A non-green letter is yellow when the answer's non-green letters
+    # still hold more copies of it than the guess used up in earlier positions.
+    import numpy as np
+    length = guesses.shape[1]
+    dtype = np.uint8 if 3 ** length <= 256 else np.uint32
+    result = np.empty((len(guesses), len(answers)), dtype=dtype)
+    for start in range(0, len(guesses), chunk):
+        g = guesses[start:start + chunk]
+        green = g[:, None, :] == answers[None, :, :]
+        pattern = np.zeros(green.shape[:2], dtype=np.int64)
+        for i in range(length):
+            letter = g[:, i][:, None]
+            available = ((answers[None, :, :] == letter[:, :, None]) & ~green).sum(axis=2)
+            used = np.zeros_like(available)
+            for j in range(i):
+                used += (g[:, j] == g[:, i])[:, None] & ~green[:, :, j]
+            yellow = ~green[:, :, i] & (available > used)
+            pattern += (GREEN * green[:, :, i] + YELLOW * yellow) * 3 ** i
+        result[start:start + chunk] = pattern
+    return result
+
+
+# =======================
+# Letter constraints
+# =======================
+class LetterIndex:
+    # Word sets as int bitmasks (bit i = word i of the index): one per letter at
+    # each position, and one per letter and count for words holding at least
+    # that many copies. A feedback row or a hand-written query is an AND of a
+    # few masks, and the set size is a popcount, so nothing scans the words.
+    __slots__ = ("index", "all", "at", "at_least")
+
+    def __init__(self, index: WordIndex):
+        import numpy as np
+        self.index = index
+        self.all = (1 << len(index)) - 1
+        words = index.encoded() - ord("a")
+        self.at = [[_mask(words[:, p] == c) for c in range(26)] for p in range(index.word_length)]
+        counts = np.stack([(words == c).sum(axis=1) for c in range(26)], axis=1)
+        self.at_least = [[self.all] + [_mask(counts[:, c] >= n) for n in range(1, index.word_length + 2)]
+                         for c in range(26)]
+
+    def feedback_mask(self, guess: str, colors: Sequence[str]) -> int:
+        # Words that would have produced exactly this feedback for the guess
+        mask = self.all
+        marked: Dict[str, int] = {}
+        grayed = set()
+        for p, (letter, color) in enumerate(zip(guess, colors)):
+            c = ord(letter) - ord("a")
+            if color == "green":
+                mask &= self.at[p][c]
+            else:
+                mask &= ~self.at[p][c]
+            if color == "gray":
+                grayed.add(letter)
+            else:
+                marked[letter] = marked.get(letter, 0) + 1
+        for letter in set(guess):
+            c, n = ord(letter) - ord("a"), marked.get(letter, 0)
+            mask &= self.at_least[c][n]
+            if letter in grayed:  # a gray copy caps the count at the marked ones
+                mask &= ~self.at_least[c][n + 1]
+        return mask & self.all
+
+    def hard_mode_mask(self, guess: str, colors: Sequence[str]) -> int:
+        # Words that reuse every hint: greens in place and each revealed letter as often
+        mask = self.all
+        marked: Dict[str, int] = {}
+        for p, (letter, color) in enumerate(zip(guess, colors)):
+            if color == "green":
+                mask &= self.at[p][ord(letter) - ord("a")]
+            if color != "gray":
+                marked[letter] = marked.get(letter, 0) + 1
+        for letter, n in marked.items():
+            mask &= self.at_least[ord(letter) - ord("a")][n]
+        return mask
+
+    def query(self, green: Iterable[Tuple[int, str]] = (), yellow: Iterable[Tuple[int, str]] = (),
+              absent: str = "") -> int:
+        # e.g. query(green=[(0, "a")], yellow=[(2, "r")], absent="e"): a at 0, an r
+        # somewhere other than 2, and no e
+        mask = self.all
+        for p, letter in green:
+            mask &= self.at[p][ord(letter) - ord("a")]
+        for p, letter in yellow:
+            c = ord(letter) - ord("a")
+            mask &= self.at_least[c][1] & ~self.at[p][c]
+        for letter in absent:
+            mask &= ~self.at_least[ord(letter) - ord("a")][1]
+        return mask & self.all
+
+    def contains(self, mask: int, word: str) -> bool:
+        i = self.index.position(word)
+        return i >= 0 and bool(mask >> i & 1)
+
+    def ids(self, mask: int) -> "np.ndarray":
+        # Sorted word ids of the set bits
+        import numpy as np
+        return np.flatnonzero(np.unpackbits(np.frombuffer(mask.to_bytes((len(self.index) + 7) // 8, "little"),
+                                                          dtype=np.uint8), bitorder="little"))
+
+    def words(self, mask: int, limit: Optional[int] = None) -> List[str]:
+        return [self.index[int(i)] for i in self.ids(mask)[:limit]]
+
+    @staticmethod
+    def count(mask: int) -> int:
+        return mask.bit_count()
+
+
+def _mask(selected: "np.ndarray") -> int:
+    import numpy as np
+    return int.from_bytes(np.packbits(selected, bitorder="little").tobytes(), "little")
+
+
+@lru_cache(maxsize=8)
+def letter_index(index: WordIndex) -> LetterIndex:
+    # Built once per dictionary and shared by every game on it
+    return LetterIndex(index)
+
+
+# =======================
+# Hints and solver
+# =======================
+class WordleSolver:
+    # Tracks which dictionary words still fit the feedback so far. Each new
+    # attempt only filters the previous survivors, so later hints get cheaper.
+    __slots__ = ("index", "words", "candidates", "seen", "rng")
+
+    def __init__(self, index: WordIndex, seed: Optional[int] = None):
+        import numpy as np
+        self.index = index
+        self.words = index.encoded()
+        self.candidates = np.arange(len(index))
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, guess: str, pattern: int):
+        patterns = pattern_matrix(encode_words([guess]), self.words[self.candidates])[0]
+        self.candidates = self.candidates[patterns == pattern]
+
+    def sync(self, attempts: Sequence[Tuple[str, List[str]]]):
+        # Feeds in only the attempts added since the last call
+        for word, colors in attempts[self.seen:]:
+            self.update(word, encode_pattern(colors))
+        self.seen = len(attempts)
+
+    def remaining(self) -> int:
+        return len(self.candidates)
+
+    def best_guess(self, allowed: Optional["np.ndarray"] = None) -> Optional[str]:
+        # Guess with the highest expected information over the candidates, plus
+        # its own chance of being the answer so ties go to words that can win.
+        # allowed (sorted word ids) limits the guesses, e.g. to what hard mode accepts;
+        # candidates always fit the feedback, so they stay allowed.
+        count = len(self.candidates)
+        if count == 0:
+            return None
+        if count <= 2:
+            return self.index[int(self.candidates[0])]
+        if count == len(self.index):
+            return _opening_guess(self.index)
+        return self._search(count, allowed)
+
+    def _search(self, count: int, allowed: Optional["np.ndarray"] = None) -> str:
+        import numpy as np
+
+        answers = self.candidates
+        if count > ANSWER_SAMPLE:
+            answers = self.rng.choice(answers, ANSWER_SAMPLE, replace=False)
+        own = self.candidates
+        if count > GUESS_POOL // 2:
+            own = self.rng.choice(own, GUESS_POOL // 2, replace=False)
+        if allowed is None:
+            others = self.rng.choice(len(self.index), min(GUESS_POOL // 2, len(self.index)), replace=False)
+        else:
+            others = self.rng.choice(allowed, min(GUESS_POOL // 2, len(allowed)), replace=False)
+        pool = np.union1d(own, others)
+
+        patterns = pattern_matrix(self.words[pool], self.words[answers]).astype(np.int64)
+        buckets = 3 ** self.index.word_length
+        offsets = np.arange(len(pool))[:, None] * buckets
+        counts = np.bincount((patterns + offsets).ravel(), minlength=len(pool) * buckets)
+        p = counts.reshape(len(pool), buckets) / len(answers)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+        score = entropy + np.isin(pool, self.candidates) / count
+        return self.index[int(pool[np.argmax(score)])]
+
+
+@lru_cache(maxsize=8)
+def _opening_guess(index: WordIndex) -> str:
+    # Every game on a dictionary opens from the same position, so search it once
+    return WordleSolver(index, seed=0)._search(len(index))
+
+
+def solve(index: WordIndex, target: str, max_attempts: int = 6, seed: Optional[int] = None) -> List[str]:
+    # Headless run of the hint strategy against a known target; returns the guesses
+    solver = WordleSolver(index, seed)
+    guesses = []
+    while len(guesses) < max_attempts:
+        guess = solver.best_guess()
+        if guess is None:
+            break
+        guesses.append(guess)
+        if guess == target:
+            break
+        solver.update(guess, feedback_pattern(guess, target))
+    return guesses
+
+
+# =======================
+# Wordle Logic
+# =======================
+class WordleGame:
+    # UI-free game: the Streamlit app and the batch evaluator both drive it
+    def __init__(self, word_index: WordIndex, target: Optional[str] = None, hard_mode: bool = False):
+        self.word_index = word_index
+        self.target = target or word_index.random_word()
+        self.max_attempts = 6
+        self.attempts = []
+        self.status = "IN_PROGRESS"
+        self.solver = None
+        self.hard_mode = hard_mode
+        self.letters = None
+        self.candidates = None  # words still consistent with the feedback, as a LetterIndex mask
+        self.hard_mask = None   # words hard mode still accepts
+
+    def to_record(self) -> bytes:
+        # Flags, attempt limit and word length, then the target and guesses as
+        # ASCII: 3 + 5 * (1 + guesses) bytes. Feedback and status are derived.
+        header = bytes((int(self.hard_mode), self.max_attempts, len(self.target)))
+        return header + self.target.encode("ascii") + b"".join(word.encode("ascii") for word, _ in self.attempts)
+
+    @classmethod
+    def from_record(cls, data: bytes, word_index: WordIndex) -> "WordleGame":
+        flags, max_attempts, length = data[0], data[1], data[2]
+        words = [data[i:i + length].decode("ascii") for i in range(3, len(data), length)]
+        game = cls(word_index, words[0], hard_mode=bool(flags & 1))
+        game.max_attempts = max_attempts
+        for word in words[1:]:
+            game.attempts.append((word, game.get_feedback(word)))
+        if game.attempts and game.attempts[-1][0] == game.target:
+            game.status = "WON"
+        elif len(game.attempts) >= game.max_attempts:
+            game.status = "LOST"
+        return game
+
+    @metrics.timed("guess")
+    def guess(self, word: str):
+        if self.status != "IN_PROGRESS":
+            return
+
+        word = word.lower()
+        if self.hard_mode:
+            error = self.hard_mode_error(word)
+            if error:
+                raise ValueError(error)
+        feedback = self.get_feedback(word)
+        self.attempts.append((word, feedback))
+        if self.letters is not None:
+            self._narrow(word, feedback)
+
+        if word == self.target:
+            self.status = "WON"
+        elif len(self.attempts) >= self.max_attempts:
+            self.status = "LOST"
+
+    def _constraints(self) -> LetterIndex:
+        # Letter masks are set up on first use, then narrowed once per guess
+        if self.letters is None:
+            self.letters = letter_index(self.word_index)
+            self.candidates = self.hard_mask = self.letters.all
+            for word, feedback in self.attempts:
+                self._narrow(word, feedback)
+        return self.letters
+
+    def _narrow(self, word: str, feedback: List[str]):
+        self.candidates &= self.letters.feedback_mask(word, feedback)
+        self.hard_mask &= self.letters.hard_mode_mask(word, feedback)
+
+    def remaining(self) -> int:
+        # Dictionary words still consistent with every feedback row
+        self._constraints()
+        return LetterIndex.count(self.candidates)
+
+    def hard_mode_error(self, word: str) -> Optional[str]:
+        # None when the guess reuses every revealed hint; otherwise the first rule it breaks
+        letters = self._constraints()
+        if letters.contains(self.hard_mask, word):
+            return None
+        for guess, feedback in self.attempts:
+            for p, (letter, color) in enumerate(zip(guess, feedback)):
+                if color == "green" and word[p] != letter:
+                    return f"Letter {p + 1} must be {letter.upper()}"
+            for letter in set(guess):
+                needed = sum(1 for g, color in zip(guess, feedback) if g == letter and color != "gray")
+                if word.count(letter) < needed:
+                    return f"Guess must contain {letter.upper()}" + (f" {needed} times" if needed > 1 else "")
+        return "Guess must be a dictionary word"
+
+    @metrics.timed("hint")
+    def hint(self) -> Optional[str]:
+        # Solver is created on first use and then only sees the new attempts
+        if self.solver is None:
+            self.solver = WordleSolver(self.word_index)
+        self.solver.sync(self.attempts)
+        if self.hard_mode:
+            return self.solver.best_guess(self._constraints().ids(self.hard_mask))
+        return self.solver.best_guess()
+
+    def get_feedback(self, guess: str) -> List[str]:
+        # Colour names for the UI; solvers work on the base-3 patterns directly
+        return decode_pattern(feedback_pattern(guess, self.target), len(guess))
+
+
+# =======================
+# Hint timing
+# =======================
+def random_words(num_words: int, seed: int = 0, word_length: int = 5) -> List[str]:
+    # Synthetic dictionary for timing runs at sizes words.txt does not reach
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < num_words:
+        words.add("".join(rng.choice(letters) for _ in range(word_length)))
+    return sorted(words)
+
+
+def measure_hint_time(num_words: int, seed: int = 0) -> float:
+    # Mean seconds per hint over one headless game on a synthetic dictionary
+    index = WordIndex(random_words(num_words, seed))
+    solver = WordleSolver(index, seed)
+    target = index.random_word()
+    hints = 0
+    start = time.perf_counter()
+    for _ in range(6):
+        guess = solver.best_guess()
+        hints += 1
+        if guess is None or guess == target:
+            break
+        solver.update(guess, feedback_pattern(guess, target))
+    return (time.perf_counter() - start) / hints
+
+
+if __name__ == "__main__":
+    for n in (2000, 13000, 100000):
+        print(f"{n:>6} words: {measure_hint_time(n) * 1000:7.1f} ms per hint")